@@ -0,0 +1,60 @@
+# Times find_clumps against the clumpFinder implementations in ecoli_clump_finder.py and
+# kmer_clump_finder.py on growing prefixes of the Vibrio cholerae genome.
+import sys
+import time
+
+sys.path.append("..")
+from kmer_clumps import find_clumps
+from ecoli_clump_finder import clumpFinder as slidingClumpFinder
+from kmer_clump_finder import clumpFinder as windowClumpFinder
+
+
+def time_call(function, *args):
+  start = time.perf_counter()
+  result = function(*args)
+  return time.perf_counter() - start, set(result)
+
+
+def run_benchmark(genome: str, k: int, L: int, t: int, sizes: list, reference_limit: int):
+  '''
+  Prints the run time of every implementation on each genome prefix and checks that they agree.
+
+  Args:
+    genome (str): the genome
+    k (int): length of the k-mer
+    L (int): length of the window
+    t (int): minimum number of occurrences inside one window
+    sizes (list): prefix lengths to time
+    reference_limit (int): largest prefix the reference implementations are run on
+  '''
+  print(f"k={k} L={L} t={t}")
+  print(f"{'bases':>10} {'find_clumps':>12} {'ecoli':>10} {'kmer':>10} {'clumps':>7}")
+
+  for size in sizes:
+    prefix = genome[:size]
+    fast_time, fast_clumps = time_call(find_clumps, prefix, k, L, t)
+    row = f"{size:>10} {fast_time:>11.3f}s"
+
+    if size <= reference_limit:
+      sliding_time, sliding_clumps = time_call(slidingClumpFinder, prefix, k, L, t)
+      assert sliding_clumps == fast_clumps, "find_clumps disagrees with ecoli_clump_finder.clumpFinder"
+      row += f" {sliding_time:>9.3f}s"
+    else:
+      row += f" {'-':>10}"
+
+    if size <= reference_limit // 10:
+      window_time, _ = time_call(windowClumpFinder, prefix, k, L, t)
+      row += f" {window_time:>9.3f}s"
+    else:
+      row += f" {'-':>10}"
+
+    print(row + f" {len(fast_clumps):>7}")
+
+
+if __name__ == "__main__":
+  with open("Vibrio_cholerae.txt", "r") as f:
+    genome = f.readline().strip()
+
+  sizes = [10_000, 100_000, len(genome), 4 * len(genome)]
+  # tile the genome to reach an E. coli sized (4.4 Mb) input
+  run_benchmark(genome * 4, 9, 500, 3, sizes, 100_000)
@@ -1,22 +1,16 @@
 # Takes in a single strand DNA sequence and outputs its compliment
+import sys
 import pyperclip
 
+sys.path.append("..")
+from reverse_complement import reverse_complement
+
 file = open("dna_compliment_finder.txt", "r")
 sequence = file.readlines()
 
-dnaDict = {"A": "T", 
-           "T": "A", 
-           "C": "G", 
-           "G": "C"}
-
 def dnaCompliment(sequence: str):
-  compliment = ""
   sequence = sequence.strip()
-  for char in sequence:
-    compliment += dnaDict[char]
-
-  compliment = compliment[::-1]
-  return compliment
+  return reverse_complement(sequence)
 
 pyperclip.copy(dnaCompliment(sequence[0]))
 print(dnaCompliment(sequence[0]))
\ No newline at end of file
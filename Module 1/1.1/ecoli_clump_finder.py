@@ -1,15 +1,8 @@
+import sys
 import pyperclip
 
-with open("E_coli.txt", "r") as f:
-  text = f.read().strip()
-
-inputs = text.splitlines()
-genome = inputs[0]
-
-numbers = inputs[1].split()
-k = numbers[0]
-L = numbers[1]
-t = numbers[2]
+sys.path.append("..")
+from kmer_clumps import find_clumps
 
 
 def FrequencyTable(text: str, k: int):
@@ -58,6 +51,19 @@ def clumpFinder(genome: str, k: int, L: int, t: int):
     return list(patterns)
 
 
-pyperclip.copy(len(clumpFinder(genome, k, L, t)))
-print("Completed")
-#print(clumpFinder(genome, k, L, t))
\ No newline at end of file
+if __name__ == "__main__":
+  with open("E_coli.txt", "r") as f:
+    text = f.read().strip()
+
+  inputs = text.splitlines()
+  genome = inputs[0]
+
+  numbers = inputs[1].split()
+  k = numbers[0]
+  L = numbers[1]
+  t = numbers[2]
+
+  clumps = find_clumps(genome, k, L, t)
+  pyperclip.copy(len(clumps))
+  print("Completed")
+  #print(clumps)
@@ -1,16 +1,9 @@
 # Finds clumps of k-mers in a genome that appear t times within a L length interval of the genome.
+import sys
 import pyperclip
 
-with open("kmer_clump_finder.txt", "r") as f:
-  text = f.read().strip()
-
-inputs = text.splitlines()
-genome = inputs[0]
-
-numbers = inputs[1].split()
-k = numbers[0]
-L = numbers[1]
-t = numbers[2]
+sys.path.append("..")
+from kmer_clumps import find_clumps
 
 
 def FrequencyTable(text: str, k: int):
@@ -19,7 +12,7 @@ def FrequencyTable(text: str, k: int):
   n = len(text)
   k = int(k)
 
-  for i in range(n-k):
+  for i in range(n-k+1):
     pattern = text[i:i+k]
     if pattern in freqMap:
       freqMap[pattern] += 1
@@ -50,5 +43,18 @@ def clumpFinder(genome: str, k: int, L: int, t: int):
   return patterns
 
 
-pyperclip.copy(' '.join(clumpFinder(genome, k, L, t)))
-print(clumpFinder(genome, k, L, t))
\ No newline at end of file
+if __name__ == "__main__":
+  with open("kmer_clump_finder.txt", "r") as f:
+    text = f.read().strip()
+
+  inputs = text.splitlines()
+  genome = inputs[0]
+
+  numbers = inputs[1].split()
+  k = numbers[0]
+  L = numbers[1]
+  t = numbers[2]
+
+  clumps = sorted(find_clumps(genome, k, L, t))
+  pyperclip.copy(' '.join(clumps))
+  print(clumps)
@@ -1,13 +1,21 @@
 # Takes a text and known ori pattern to find sequence count
+import sys
+
+sys.path.append("..")
+from kmer_position_index import KmerPositionIndex
 
 file = open("ori_finder_known.txt", "r")
 sequences = file.readlines()
 
 def findPatternCount(text, pattern):
   count = 0 
-  text = text.strip()
   pattern = pattern.strip()
 
+  if isinstance(text, KmerPositionIndex):
+    return text.count_pattern(pattern)
+
+  text = text.strip()
+
   for i in range(len(text) - len(pattern)):
     if text[i:i+len(pattern)] == pattern:
       count += 1
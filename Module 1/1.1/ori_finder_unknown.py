@@ -1,4 +1,10 @@
 # Takes a text k-mer count to return most frequent sequences
+import sys
+
+sys.path.append("..")
+from kmer_counter import count_kmers
+from kmer_sketch import FrequentKmerSketch
+from mismatch_counter import frequent_words_by_sorting
 
 file = open("ori_finder_unknown.txt", "r")
 sequences = file.readlines()
@@ -9,7 +15,7 @@ def FrequencyTable(text: str, k: int):
   n = len(text)
   k = int(k)
 
-  for i in range(n-k):
+  for i in range(n-k+1):
     pattern = text[i:i+k]
     if pattern in freqMap:
       freqMap[pattern] += 1
@@ -27,13 +33,20 @@ def MaxMap(freqMap: dict):
   return maximum
 
 
-def HighestFrequencyKmer(text: str, k: int):
-  FrequencyPatterns = []
-  freqMap = FrequencyTable(text, k)
-  maximum = MaxMap(freqMap)
-  for patterns in freqMap.keys():
-    if freqMap[patterns] == maximum:
-      FrequencyPatterns.append(patterns)
-  return FrequencyPatterns
+def HighestFrequencyKmer(text: str, k: int, approximate: bool = False, sorting: bool = False):
+  if sorting:
+    return frequent_words_by_sorting(text, int(k))[0]
+
+  if approximate:
+    sketch = FrequentKmerSketch(int(k))
+    sketch.update(text.strip())
+    counts = sketch.verify([text.strip()], 1)
+    return [kmer for kmer, count in counts if counts and count == counts[0][1]]
+
+  return count_kmers(text, int(k)).most_frequent()
+
+
+def TopFrequencyKmers(text: str, k: int, n: int):
+  return count_kmers(text, int(k)).top(n)
 
 print(HighestFrequencyKmer(sequences[0], sequences[1]))
\ No newline at end of file
@@ -0,0 +1,53 @@
+# Times count_kmers_parallel with 1 to N worker processes against the serial count_kmers
+# and checks that every run returns exactly the serial counts.
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("..")
+from kmer_counter import count_kmers
+from parallel_kmer_counter import count_kmers_parallel, uses_shared_counts
+
+
+def run_benchmark(genome: str, k: int, max_workers: int):
+  '''
+  Prints the run time and speed-up of every worker count, and whether the run counted into
+  the shared matrix or fell back to returning sorted codes (past SHARED_COUNTS_MAX_BYTES).
+
+  Args:
+    genome (str): the genome
+    k (int): length of the k-mer
+    max_workers (int): largest number of worker processes to try
+  '''
+  start = time.perf_counter()
+  serial = count_kmers(genome, k)
+  serial_time = time.perf_counter() - start
+  serial_codes, serial_counts = serial.nonzero()
+
+  print(f"{len(genome)} bases, k={k}")
+  print(f"{'workers':>8} {'time':>9} {'speed-up':>9} {'path':>7}")
+  print(f"{'serial':>8} {serial_time:>8.3f}s {1:>8.2f}x {'-':>7}")
+
+  workers = 1
+  while workers <= max_workers:
+    start = time.perf_counter()
+    parallel = count_kmers_parallel(genome, k, workers)
+    parallel_time = time.perf_counter() - start
+
+    parallel_codes, parallel_counts = parallel.nonzero()
+    assert np.array_equal(serial_codes, parallel_codes) and np.array_equal(serial_counts, parallel_counts), \
+      f"parallel counts with {workers} workers differ from the serial counts"
+
+    path = "shared" if uses_shared_counts(len(genome) - k + 1, k, workers) else "sparse"
+    print(f"{workers:>8} {parallel_time:>8.3f}s {serial_time / parallel_time:>8.2f}x {path:>7}")
+    workers *= 2
+
+
+if __name__ == "__main__":
+  with open("Vibrio_cholerae.txt", "r") as f:
+    genome = f.readline().strip()
+
+  # tile the genome to get a ~35 Mb input, large enough for the process start-up to pay off
+  run_benchmark(genome * 32, 12, os.cpu_count())
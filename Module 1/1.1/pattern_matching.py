@@ -1,19 +1,33 @@
 # Finds the positions of patterns within a genome
+import sys
 import pyperclip
 
+sys.path.append("..")
+from fm_index import FMIndex
+from kmer_position_index import KmerPositionIndex
+from packed_dna import PackedDNA
+
 file = open("pattern_matching.txt", "r")
 sequence = file.readlines()
 pattern = sequence[0]
 text = sequence[1]
 
-def findPattern(pattern: str, text: str):
-  positions = []
+def findPattern(pattern: str, text):
   pattern = pattern.strip()
-  text = text.strip()
 
-  for i in range(len(text) - len(pattern)):
-    if text[i:i+len(pattern)] == pattern:
-      positions.append(str(i))
+  # text can be a prebuilt (or loaded) FMIndex or KmerPositionIndex for repeated queries
+  # against one genome
+  if isinstance(text, FMIndex):
+    return [str(i) for i in text.find(pattern)]
+  if isinstance(text, KmerPositionIndex):
+    return [str(i) for i in text.find_pattern(pattern).tolist()]
+
+  positions = []
+  text = str(text) if isinstance(text, PackedDNA) else text.strip()
+  i = text.find(pattern)
+  while i != -1:
+    positions.append(str(i))
+    i = text.find(pattern, i + 1)
   return positions
 
 positions = findPattern(pattern, text)
@@ -1,22 +1,19 @@
+import sys
 import pyperclip
 
-file = open("Vibrio_cholerae.txt", "r")
-sequence = file.readlines()
-text = sequence[0]
+sys.path.append("..")
+from fm_index import load_or_build_fm_index
+
+# The index is built on the first run and memory-mapped from Vibrio_cholerae.txt.fmi afterwards
+index = load_or_build_fm_index("Vibrio_cholerae.txt")
 pattern = "CTTGATCAT"
 
-def findPattern(pattern: str, text: str):
-  positions = []
+def findPattern(pattern: str, index):
   pattern = pattern.strip()
-  text = text.strip()
-
-  for i in range(len(text) - len(pattern)):
-    if text[i:i+len(pattern)] == pattern:
-      positions.append(str(i))
-  return positions
+  return [str(i) for i in index.find(pattern)]
 
-positions = findPattern(pattern, text)
+positions = findPattern(pattern, index)
 positions = ' '.join(positions)
 pyperclip.copy(positions)
 
-print(findPattern(pattern, text))
\ No newline at end of file
+print(findPattern(pattern, index))
@@ -1,6 +1,11 @@
 # Finds the positions of k-mers in a text that are within a Hamming distance d of a pattern.
+import sys
 import pyperclip
 
+sys.path.append("..")
+from approximate_matching import as_matcher
+from hamming import hamming_distance
+
 text = open("approx_pattern_matching.txt", "r")
 text = text.read().strip()
 sequences = text.splitlines()
@@ -14,20 +19,13 @@ print(pattern, d)
 def computeHammingDistance(sequence1, sequence2):
     if len(sequence1) != len(sequence2):
         return -1
-    hammingDistance = 0
-    for i in range(len(sequence1)):
-        if sequence1[i] != sequence2[i]:
-            hammingDistance += 1
-    return hammingDistance
-
-
-def approximatePatterns(pattern: str, text: str, d: int):
-    positions = []
-    k = len(pattern)
-    for i in range(len(text) - k + 1):
-        if computeHammingDistance(pattern, text[i:i+k]) <= d:
-            positions.append(i)
-    return positions
+    return hamming_distance(sequence1, sequence2)
+
+
+def approximatePatterns(pattern: str, text, d: int):
+    # text may be a matcher already built for the text (BitParallelMatcher, or
+    # SeedAndVerifyMatcher for many patterns against one genome), to reuse across patterns
+    return as_matcher(text).positions(pattern, d).tolist()
 
 
 test_pattern = "ATTCTGGA"
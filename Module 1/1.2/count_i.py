@@ -1,28 +1,23 @@
 # Finds the number of k-mers in a text that are within a Hamming distance d of a pattern.
+import sys
+
+sys.path.append("..")
+from approximate_matching import as_matcher
+from hamming import hamming_distance
 
 
 def computeHammingDistance(sequence1, sequence2):
     if len(sequence1) != len(sequence2):
         return -1
-    hammingDistance = 0
-    for i in range(len(sequence1)):
-        if sequence1[i] != sequence2[i]:
-            hammingDistance += 1
-    return hammingDistance
+    return hamming_distance(sequence1, sequence2)
 
 
-def approximatePatterns(pattern: str, text: str, d: int):
-    positions = []
-    k = len(pattern)
-    for i in range(len(text) - k + 1):
-        if computeHammingDistance(pattern, text[i:i+k]) <= d:
-            positions.append(i)
-    return positions
+def approximatePatterns(pattern: str, text, d: int):
+    return as_matcher(text).positions(pattern, d).tolist()
 
 
 def countI(pattern, sequence, d):
-    positions = approximatePatterns(pattern, sequence, d)
-    return len(positions)
+    return as_matcher(sequence).count(pattern, d)
 
 
 # text = open("count_i.txt", "r")
@@ -1,5 +1,10 @@
+import sys
 import pyperclip
 
+sys.path.append("..")
+from mismatch_counter import frequent_words_by_sorting, frequent_words_with_mismatches
+from neighborhood import neighbor_strings
+
 def MaxMap(freqMap: dict):
   maximum = 0
   for key in freqMap.keys():
@@ -20,37 +25,14 @@ def immediateNeighbors(pattern):
 
 
 def iterativeNeighbors(pattern, d):
-    neighborhood = {pattern}
-    for j in range(d):
-        for text in neighborhood.copy():
-            neighborhood = neighborhood.union(immediateNeighbors(text))
-    return neighborhood
-
-
-def frequentWordsWithMismatches(text, k, d):
-    Patterns = []
-    freqMap = {}
-    n = len(text)
-
-    for i in range(n-k):
-      pattern = text[i:i+k]
-      neighborhood = iterativeNeighbors(pattern, d)
-
-      for i in range(len(neighborhood)):
-          neighbor = list(neighborhood)[i]
-
-          if neighbor not in freqMap:
-              freqMap[neighbor] = 1
-          else:
-              freqMap[neighbor] += 1
+    return neighbor_strings(pattern, d)
 
-    maxCount = MaxMap(freqMap)
 
-    for pattern in freqMap.keys():
-      if freqMap[pattern] == maxCount:
-        Patterns.append(pattern)
+def frequentWordsWithMismatches(text, k, d, sorting=False):
+    if sorting:
+        return frequent_words_by_sorting(text.strip(), k, d)[0]
 
-    return Patterns
+    return frequent_words_with_mismatches(text.strip(), k, d)
 
 
 text = open("freq_word_with_mismatches.txt", "r")
@@ -1,5 +1,11 @@
+import sys
 import pyperclip
 
+sys.path.append("..")
+from mismatch_counter import frequent_words_with_mismatches
+from neighborhood import neighbor_strings
+from reverse_complement import reverse_complement
+
 
 def MaxMap(freqMap: dict):
     maximum = 0
@@ -20,59 +26,17 @@ def immediateNeighbors(pattern):
     return neighborhood
 
 
-dnaDict = {
-    "A": "T", 
-    "T": "A", 
-    "C": "G", 
-    "G": "C"
-}
-
 def dnaCompliment(sequence: str):
-    compliment = ""
     sequence = sequence.strip()
-    for char in sequence:
-        compliment += dnaDict[char]
-    compliment = compliment[::-1]
-    return compliment
+    return reverse_complement(sequence)
 
 
 def iterativeNeighbors(pattern, d):
-    neighborhood = {pattern}
-    for j in range(d):
-        for text in neighborhood.copy():
-            neighborhood = neighborhood.union(immediateNeighbors(text))
-    return neighborhood
+    return neighbor_strings(pattern, d)
 
 
 def frequentWordsWithMismatches(text, k, d):
-    Patterns = []
-    freqMap = {}
-    n = len(text)
-
-    for i in range(n - k + 1):
-        pattern = text[i:i + k]
-        neighborhood = iterativeNeighbors(pattern, d)
-
-        for neighbor in neighborhood:
-            if neighbor not in freqMap:
-                freqMap[neighbor] = 1
-            else:
-                freqMap[neighbor] += 1
-
-
-            complement = dnaCompliment(neighbor)
-            if complement not in freqMap:
-                freqMap[complement] = 1
-            else:
-                freqMap[complement] += 1
-
-    maxCount = MaxMap(freqMap)
-
-    for pattern in freqMap.keys():
-        if freqMap[pattern] == maxCount:
-            Patterns.append(pattern)
-
-    return Patterns
+    return frequent_words_with_mismatches(text.strip(), k, d, reverse=True)
 
 
 text = open("freq_word_with_mismatches_and_reverse.txt", "r")
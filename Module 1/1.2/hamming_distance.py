@@ -1,4 +1,8 @@
 # Finds the Hamming distance (number of different base pairs) between two strings
+import sys
+
+sys.path.append("..")
+from hamming import hamming_distance
 
 test_sequence1 = "CTTGAAGTGGACCTCTAGTTCCTCTACAAAGAACAGGTTGACCTGTCGCGAAG"
 test_sequence2 = "ATGCCTTACCTAGATGCAATGACGGACGTATTCCTTTTGCCTCAACGGCTCCT"
@@ -6,11 +10,7 @@ test_sequence2 = "ATGCCTTACCTAGATGCAATGACGGACGTATTCCTTTTGCCTCAACGGCTCCT"
 def computeHammingDistance(sequence1, sequence2):
     if len(sequence1) != len(sequence2):
         return -1
-    hammingDistance = 0
-    for i in range(len(sequence1)):
-        if sequence1[i] != sequence2[i]:
-            hammingDistance += 1
-    return hammingDistance
+    return hamming_distance(sequence1, sequence2)
 
 # text = open("hamming_distance.txt", "r")
 # text = text.read().strip()
@@ -1,5 +1,10 @@
+import sys
 import pyperclip
 
+sys.path.append("..")
+from hamming import hamming_distance
+from neighborhood import neighbor_strings
+
 def immediateNeighbors(pattern):
     neighborhood = []
     for i in range(len(pattern)):
@@ -12,21 +17,13 @@ def immediateNeighbors(pattern):
 
 
 def iterativeNeighbors(pattern, d):
-    neighborhood = {pattern}
-    for j in range(d):
-        for text in neighborhood.copy():
-            neighborhood = neighborhood.union(immediateNeighbors(text))
-    return neighborhood
+    return neighbor_strings(pattern, d)
 
 
 def computeHammingDistance(sequence1, sequence2):
     if len(sequence1) != len(sequence2):
         return -1
-    hammingDistance = 0
-    for i in range(len(sequence1)):
-        if sequence1[i] != sequence2[i]:
-            hammingDistance += 1
-    return hammingDistance
+    return hamming_distance(sequence1, sequence2)
 
 
 def suffix(pattern):
@@ -34,23 +31,7 @@ def suffix(pattern):
 
 
 def neighbors(pattern, d):
-    if d == 0:
-        return {pattern}
-    if len(pattern) == 1:
-        return {'A', 'C', 'G', 'T'}
-
-    neighborhood = set()
-    suffix_neighbors = neighbors(suffix(pattern), d)
-
-    for text in suffix_neighbors:
-
-        if computeHammingDistance(suffix(pattern), text) < d:
-            for nucleotide in 'ACGT':
-                neighborhood.add(nucleotide + text)
-        else:
-            neighborhood.add(pattern[0] + text)
-
-    return neighborhood
+    return neighbor_strings(pattern, d)
 
 
 # text = open("neighbors.txt", "r")
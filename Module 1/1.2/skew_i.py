@@ -1,21 +1,17 @@
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append("..")
+from gc_skew import compute_skew, envelope_bucket_size, skew_envelope
+
 testSequence = "GATACACTTCCCGAGTAGGTACTG"
 # text = open("skew_i.txt", "r")
 # sequence = text.read().strip()
 
 
 def computeSkew(a: str, b: str, sequence: str):
-  skew = np.zeros(len(sequence) + 1)
-  for i in range(len(sequence)):
-      if sequence[i] == a:
-          skew[i + 1] = skew[i] + 1
-      elif sequence[i] == b:
-          skew[i + 1] = skew[i] - 1
-      else:
-          skew[i + 1] = skew[i]
-  return skew
+  return compute_skew(sequence, a, b)
 
 
 def findOri(sequence: str):
@@ -27,7 +23,12 @@ def findOri(sequence: str):
 
 def plotSkew(sequence: str):
   skew = computeSkew("G", "C", sequence)
-  plt.plot(skew)
+  bucketSize = envelope_bucket_size(len(skew))
+  if bucketSize == 1:
+    plt.plot(skew)
+  else:
+    starts, lows, highs = skew_envelope(skew, bucketSize)
+    plt.fill_between(starts, lows, highs)
   plt.show()
 
 
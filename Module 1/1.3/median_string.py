@@ -1,51 +1,26 @@
+import sys
 import pyperclip
 import numpy as np
 
-
-def computeHammingDistance(p, q):
-  return sum(p != q for p, q in zip(p, q))
+sys.path.append("..")
+from hamming import distances_to_sequences
+from kmer_codec import pattern_to_number
+from median_search import branch_and_bound_median
+from parallel_median_search import parallel_median
 
 
 def distanceBetweenPatternAndString(pattern, dna):
-  k = len(pattern)
-
-  distance = 0
-
-  for seq in dna:
-    n = len(seq)
-    hamming_distance = float('inf')
-    for i in range(n - k + 1):
-      new_hamming_distance = computeHammingDistance(pattern, seq[i: i+k])
-      if new_hamming_distance < hamming_distance:
-        hamming_distance =  new_hamming_distance
-    distance += hamming_distance
-  
-  return distance
-
-
-def generateKmers(k):
-    nucleotides = ['A', 'C', 'G', 'T']
-    kmers = []
-    
-    def generate(prefix, k):
-        if k == 0:
-            kmers.append(prefix)
-            return
-        for nucleotide in nucleotides:
-            generate(prefix + nucleotide, k - 1)
-    
-    generate('', k)
-    return kmers
-
+  return int(distances_to_sequences([pattern_to_number(pattern)], len(pattern), dna)[0])
 
-def medianString(dna, k):
-   distance = float('inf')
-   kmers = generateKmers(k)
 
-   for kmer in kmers:
-      if distanceBetweenPatternAndString(kmer, dna) < distance:
-         distance = distanceBetweenPatternAndString(kmer, dna)
-         median = kmer
+def medianString(dna, k, workers=1, time_budget=None):
+   # branch and bound over the k-mer prefix tree, sharded across processes when workers > 1
+   if workers == 1 and time_budget is None:
+      median, _ = branch_and_bound_median(dna, k)
+      return median
+   median, distance, complete = parallel_median(dna, k, workers, time_budget)
+   if not complete:
+      print(f"time budget ran out, best median found has distance {distance}", file=sys.stderr)
    return median
 
 
@@ -1,25 +1,23 @@
+import sys
 import pyperclip
 import numpy as np
 
-
-def computeHammingDistance(p, q):
-  return sum(p != q for p, q in zip(p, q))
+sys.path.append("..")
+from hamming import all_distances_to_sequences, distances_to_sequences
+from kmer_codec import pattern_to_number
 
 
 def distanceBetweenPatternAndString(pattern, dna):
-  k = len(pattern)
-
-  distance = 0
-
-  for seq in dna:
-    n = len(seq)
-    hamming_distance = float('inf')
-    for i in range(n - k + 1):
-      if computeHammingDistance(pattern, seq[i: i+k]) < hamming_distance:
-        hamming_distance = computeHammingDistance(pattern, seq[i: i+k])
-    distance += hamming_distance
-  
-  return distance
+  return int(distances_to_sequences([pattern_to_number(pattern)], len(pattern), dna)[0])
+
+
+def distancesBetweenPatternsAndStrings(patterns, dna, k=None):
+  # all patterns share one k; without patterns every one of the 4^k k-mers is scored,
+  # and the result is then indexed by k-mer code
+  if patterns is None:
+    return all_distances_to_sequences(k, dna)
+  codes = np.array([pattern_to_number(pattern) for pattern in patterns], dtype=np.uint64)
+  return distances_to_sequences(codes, len(patterns[0]), dna)
 
 
 # pattern = "AAA"
@@ -0,0 +1,137 @@
+# Aho-Corasick automaton over the ACGT alphabet: reports every occurrence of every pattern
+# in a single pass over the genome, however many patterns (DnaA boxes, their reverse
+# complements, ...) are queried at once.
+from collections import deque
+
+from genome_reader import CHUNK_SIZE, iter_genome_chunks
+from kmer_codec import sequence_codes
+
+
+class AhoCorasick:
+  '''
+  Multi-pattern exact matcher compiled into a full transition table (a DFA), so every base
+  costs one table lookup whatever the number of patterns.
+
+  Attributes:
+    patterns (list): distinct patterns, in the order first given
+    transitions (list): transitions[state][base code] is the next state
+    outputs (list): outputs[state] lists the indices of the patterns ending in that state
+  '''
+
+  def __init__(self, patterns: list):
+    self.patterns = list(dict.fromkeys(pattern.strip().upper() for pattern in patterns))
+    self.transitions = [[0, 0, 0, 0]]
+    self.outputs = [[]]
+
+    for index, pattern in enumerate(self.patterns):
+      state = 0
+      for code in self.encode(pattern):
+        if code > 3:
+          raise ValueError(f"Pattern {pattern!r} contains a base other than A, C, G or T")
+        if self.transitions[state][code] == 0:
+          self.transitions.append([0, 0, 0, 0])
+          self.outputs.append([])
+          self.transitions[state][code] = len(self.transitions) - 1
+        state = self.transitions[state][code]
+      self.outputs[state].append(index)
+
+    self.max_length = max((len(pattern) for pattern in self.patterns), default=0)
+    self.build_failure_links()
+
+  @staticmethod
+  def encode(text) -> list:
+    return sequence_codes(text).tolist()
+
+  def build_failure_links(self):
+    '''
+    Breadth-first pass turning the trie into a DFA: missing transitions follow the failure
+    link (the longest proper suffix that is also a trie path), and every state inherits the
+    outputs of its failure state.
+    '''
+    failure = [0] * len(self.transitions)
+    queue = deque()
+    for code in range(4):
+      child = self.transitions[0][code]
+      if child:
+        queue.append(child)
+
+    while queue:
+      state = queue.popleft()
+      self.outputs[state] = self.outputs[state] + self.outputs[failure[state]]
+      for code in range(4):
+        child = self.transitions[state][code]
+        if child:
+          failure[child] = self.transitions[failure[state]][code]
+          queue.append(child)
+        else:
+          self.transitions[state][code] = self.transitions[failure[state]][code]
+
+  def iter_matches(self, text, offset: int = 0, min_end: int = 0):
+    '''
+    Yields every pattern occurrence in text in order of end position. A non-ACGT base resets
+    the automaton, since no pattern can match across it.
+
+    Args:
+      text (str or bytes): the sequence to scan
+      offset (int): added to every reported position, e.g. the start of a genome chunk
+      min_end (int): only report matches ending after text[min_end - 1]
+
+    Yields:
+      (pattern, position) (tuple): the matched pattern and its start position
+    '''
+    transitions = self.transitions
+    outputs = self.outputs
+    patterns = self.patterns
+    state = 0
+
+    for i, code in enumerate(self.encode(text)):
+      if code > 3:
+        state = 0
+        continue
+      state = transitions[state][code]
+      if outputs[state] and i >= min_end:
+        for index in outputs[state]:
+          yield patterns[index], offset + i - len(patterns[index]) + 1
+
+  def iter_matches_in_chunks(self, chunks):
+    '''
+    Yields every pattern occurrence in a stream of overlapping chunks such as iter_genome_chunks
+    produces. A match lying entirely inside the overlap with the previous chunk was already
+    reported there and is skipped. The overlap must be at least the longest pattern length - 1.
+
+    Args:
+      chunks (iterable): (start, chunk) pairs in genome order
+
+    Yields:
+      (pattern, position) (tuple): the matched pattern and its start position in the genome
+    '''
+    previous_end = 0
+    for start, chunk in chunks:
+      overlap = max(previous_end - start, 0)
+      yield from self.iter_matches(chunk, start, overlap)
+      previous_end = start + len(chunk)
+
+  def group_matches(self, matches) -> dict:
+    positions = {pattern: [] for pattern in self.patterns}
+    for pattern, position in matches:
+      positions[pattern].append(position)
+    return positions
+
+  def find_all(self, text) -> dict:
+    '''
+    Finds every occurrence of every pattern in one pass.
+
+    Args:
+      text (str or bytes): the sequence to scan
+
+    Returns:
+      positions (dict): maps each pattern to the sorted list of its start positions
+    '''
+    return self.group_matches(self.iter_matches(text))
+
+  def find_all_in_file(self, path: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    '''
+    Finds every occurrence of every pattern in a genome file, streaming it chunk by chunk.
+    '''
+    chunks = iter_genome_chunks(path, chunk_size, max(self.max_length - 1, 0))
+    return self.group_matches(self.iter_matches_in_chunks(chunks))
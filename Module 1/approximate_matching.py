@@ -0,0 +1,226 @@
+# Bit-parallel approximate pattern matching (Hamming distance <= d). The text is turned into
+# one occurrence bitmask per base, packed 64 positions per uint64 word; for every pattern
+# position the matching mask is shifted into place and its mismatch bits are added into a
+# bit-sliced counter, so each step handles 64 windows per word operation.
+# For many patterns against one genome, SeedAndVerifyMatcher instead looks pattern seeds up in
+# a persistent k-mer index and only checks the candidate windows they point at.
+import numpy as np
+
+from genome_reader import read_genome
+from kmer_codec import sequence_codes
+from kmer_position_index import KmerPositionIndex, load_or_build_kmer_index
+
+WORD_BITS = 64
+
+# candidate windows verified per batch, bounding the (candidates x pattern length) gather
+VERIFY_BATCH = 1 << 16
+
+
+def pack_bits(bits: np.ndarray, words: int) -> np.ndarray:
+  '''
+  Packs a bool array into uint64 words, position i going to bit i % 64 of word i // 64.
+  '''
+  packed = np.zeros(words * 8, dtype=np.uint8)
+  as_bytes = np.packbits(bits, bitorder="little")
+  packed[:len(as_bytes)] = as_bytes
+  return packed.view(np.uint64)
+
+
+def shift_down(words: np.ndarray, shift: int) -> np.ndarray:
+  '''
+  Bitset shift such that bit i of the result is bit i + shift of words (zeros shifted in).
+  '''
+  word_shift, bit_shift = divmod(shift, WORD_BITS)
+  shifted = np.zeros_like(words)
+  if word_shift >= len(words):
+    return shifted
+  shifted[:len(words) - word_shift] = words[word_shift:]
+  if bit_shift:
+    carried = np.zeros_like(words)
+    carried[:-1] = shifted[1:] << np.uint64(WORD_BITS - bit_shift)
+    shifted = (shifted >> np.uint64(bit_shift)) | carried
+  return shifted
+
+
+def add_bit(planes: list, bits: np.ndarray):
+  '''
+  Adds a 0/1 bitset to a bit-sliced counter (planes[b] holds bit b of every position's count),
+  ripple-carrying 64 positions per word operation.
+  '''
+  carry = bits
+  for b in range(len(planes)):
+    planes[b], carry = planes[b] ^ carry, planes[b] & carry
+
+
+def at_most(planes: list, d: int) -> np.ndarray:
+  '''
+  Bitset of the positions whose bit-sliced count is <= d, found by comparing the count with d
+  from the most significant plane down.
+  '''
+  greater = np.zeros_like(planes[0])
+  equal = ~np.zeros_like(planes[0])
+  for b in reversed(range(len(planes))):
+    if (d >> b) & 1:
+      equal &= planes[b]
+    else:
+      greater |= equal & planes[b]
+      equal &= ~planes[b]
+  return ~greater
+
+
+class BitParallelMatcher:
+  '''
+  Occurrence bitmasks of one text (or of its base codes, as kmer_codec.sequence_codes returns them),
+  reusable for any number of patterns.
+
+  Attributes:
+    length (int): length of the text
+    masks (np.ndarray): masks[c] has bit i set when text[i] is base c (A=0, C=1, G=2, T=3)
+  '''
+
+  def __init__(self, text=None, codes: np.ndarray = None):
+    if codes is None:
+      codes = sequence_codes(text.strip())
+    self.length = len(codes)
+    words = (self.length + WORD_BITS - 1) // WORD_BITS
+    self.masks = np.stack([pack_bits(codes == base, words) for base in range(4)])
+
+  def match_bits(self, pattern: str, d: int) -> np.ndarray:
+    '''
+    Bitset of the window starts whose Hamming distance to pattern is at most d.
+    '''
+    codes = sequence_codes(pattern.strip(), strict=True)
+    k = len(codes)
+    windows = self.length - k + 1
+    words = self.masks.shape[1]
+    if windows <= 0:
+      return np.zeros(words, dtype=np.uint64)
+
+    # enough planes to hold both the largest possible count (k) and d
+    planes = [np.zeros(words, dtype=np.uint64) for _ in range(max(k, d, 1).bit_length())]
+    for j, base in enumerate(codes.tolist()):
+      add_bit(planes, ~shift_down(self.masks[base], j))
+
+    # drop the window starts too close to the end to hold the whole pattern
+    valid = pack_bits(np.arange(words * WORD_BITS) < windows, words)
+    return at_most(planes, d) & valid
+
+  def positions(self, pattern: str, d: int) -> np.ndarray:
+    '''
+    Every start position of a window within Hamming distance d of pattern.
+
+    Args:
+      pattern (str): the pattern
+      d (int): maximum number of mismatches
+
+    Returns:
+      positions (np.ndarray): sorted start positions
+    '''
+    bits = np.unpackbits(self.match_bits(pattern, d).view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits)
+
+  def count(self, pattern: str, d: int) -> int:
+    '''
+    Number of windows within Hamming distance d of pattern.
+    '''
+    return int(np.unpackbits(self.match_bits(pattern, d).view(np.uint8)).sum())
+
+
+class SeedAndVerifyMatcher:
+  '''
+  Approximate matcher for many patterns against one genome, built on the pigeonhole principle:
+  cut a pattern into d + 1 seeds and at least one of them occurs exactly in any window within
+  Hamming distance d. Every seed is looked up in a KmerPositionIndex, and only the windows the
+  hits point at are verified, so the work follows the number of hits instead of the genome
+  length. Patterns whose seeds are shorter than the index k go through a BitParallelMatcher.
+
+  Attributes:
+    genome_codes (np.ndarray): one code per genome base
+    index (KmerPositionIndex): exact k-mer index of the same genome
+  '''
+
+  def __init__(self, genome, index: KmerPositionIndex):
+    self.genome_codes = sequence_codes(genome.strip())
+    self.index = index
+    self.fallback = None
+
+  @classmethod
+  def from_file(cls, genome_path: str, k: int, index_dir: str = None):
+    '''
+    Matcher over a genome file, reusing (or building once) its saved k-mer position index.
+    '''
+    return cls(read_genome(genome_path), load_or_build_kmer_index(genome_path, k, index_dir))
+
+  def candidates(self, codes: np.ndarray, d: int) -> np.ndarray:
+    '''
+    Distinct window starts where at least one of the d + 1 seeds of the pattern occurs exactly.
+    '''
+    m = len(codes)
+    seed_starts = [i * m // (d + 1) for i in range(d + 1)]
+    window_starts = []
+    for seed_start in seed_starts:
+      code = 0
+      for base in codes[seed_start:seed_start + self.index.k].tolist():
+        code = (code << 2) | base
+      row = self.index.group(code)
+      if row >= 0:
+        hits = np.asarray(self.index.positions[self.index.offsets[row]:self.index.offsets[row + 1]])
+        window_starts.append(hits - seed_start)
+
+    if not window_starts:
+      return np.zeros(0, dtype=np.int64)
+    starts = np.unique(np.concatenate(window_starts))
+    return starts[(starts >= 0) & (starts <= len(self.genome_codes) - m)]
+
+  def positions(self, pattern: str, d: int) -> np.ndarray:
+    '''
+    Every start position of a window within Hamming distance d of pattern.
+
+    Args:
+      pattern (str): the pattern
+      d (int): maximum number of mismatches
+
+    Returns:
+      positions (np.ndarray): sorted start positions
+    '''
+    codes = sequence_codes(pattern.strip(), strict=True)
+    m = len(codes)
+    if m // (d + 1) < self.index.k:
+      if self.fallback is None:
+        self.fallback = BitParallelMatcher(codes=self.genome_codes)
+      return self.fallback.positions(pattern, d)
+
+    starts = self.candidates(codes, d)
+    offsets = np.arange(m)
+    matches = []
+    for first in range(0, len(starts), VERIFY_BATCH):
+      batch = starts[first:first + VERIFY_BATCH]
+      mismatches = (self.genome_codes[batch[:, None] + offsets] != codes).sum(axis=1)
+      matches.append(batch[mismatches <= d])
+    return np.concatenate(matches) if matches else starts
+
+  def count(self, pattern: str, d: int) -> int:
+    return len(self.positions(pattern, d))
+
+  def find_all(self, patterns: list, d: int) -> dict:
+    '''
+    Approximate occurrences of many patterns.
+
+    Args:
+      patterns (list): the patterns
+      d (int): maximum number of mismatches
+
+    Returns:
+      positions (dict): maps each pattern to the sorted list of its start positions
+    '''
+    return {pattern: self.positions(pattern, d).tolist() for pattern in dict.fromkeys(patterns)}
+
+
+def as_matcher(text):
+  '''
+  Returns text itself when it is already a matcher (BitParallelMatcher or SeedAndVerifyMatcher),
+  otherwise a BitParallelMatcher over it.
+  '''
+  if isinstance(text, (BitParallelMatcher, SeedAndVerifyMatcher)):
+    return text
+  return BitParallelMatcher(text)
@@ -0,0 +1,238 @@
+# Suffix array + BWT/FM-index for repeated exact pattern queries against one genome.
+# The index is built once per genome, saved as .npy files and memory-mapped on load,
+# so every later query (in any process) costs O(len(pattern) + number of hits).
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from genome_reader import read_genome
+from packed_dna import PackedDNA
+
+# $ sorts before every base; anything that is not ACGT (N, IUPAC codes, ...) gets its own symbol
+SENTINEL = 0
+ALPHABET_SIZE = 6
+OCC_SAMPLE_RATE = 128
+
+SYMBOL_TABLE = np.full(256, 5, dtype=np.uint8)
+for code, base in enumerate("ACGT", start=1):
+  SYMBOL_TABLE[ord(base)] = code
+  SYMBOL_TABLE[ord(base.lower())] = code
+
+
+def encode_text(text) -> np.ndarray:
+  '''
+  Maps a DNA string to FM-index symbols (A=1, C=2, G=3, T=4, other=5) and appends the sentinel.
+
+  Args:
+    text (str, bytes or PackedDNA): DNA sequence
+
+  Returns:
+    symbols (np.ndarray): uint8 array of length len(text) + 1 ending in the sentinel
+  '''
+  if isinstance(text, PackedDNA):
+    symbols = np.empty(len(text) + 1, dtype=np.uint8)
+    symbols[:-1] = text.codes() + 1
+    symbols[-1] = SENTINEL
+    return symbols
+  if isinstance(text, str):
+    text = text.encode("ascii")
+  symbols = np.empty(len(text) + 1, dtype=np.uint8)
+  symbols[:-1] = SYMBOL_TABLE[np.frombuffer(text, dtype=np.uint8)]
+  symbols[-1] = SENTINEL
+  return symbols
+
+
+def build_suffix_array(symbols: np.ndarray) -> np.ndarray:
+  '''
+  Builds the suffix array of a sentinel-terminated symbol array by prefix doubling.
+  Every round sorts the suffixes by the (rank, rank h positions later) pair, so the
+  number of rounds is logarithmic in the longest repeat of the genome.
+
+  Args:
+    symbols (np.ndarray): symbol array whose last element is the unique smallest symbol
+
+  Returns:
+    suffix_array (np.ndarray): start positions of the suffixes in lexicographic order
+  '''
+  n = len(symbols)
+  rank = symbols.astype(np.int64)
+  h = 1
+
+  while True:
+    second = np.full(n, -1, dtype=np.int64)
+    second[:n - h] = rank[h:]
+    suffix_array = np.lexsort((second, rank))
+
+    sorted_rank = rank[suffix_array]
+    sorted_second = second[suffix_array]
+    changed = (sorted_rank[1:] != sorted_rank[:-1]) | (sorted_second[1:] != sorted_second[:-1])
+    new_rank = np.empty(n, dtype=np.int64)
+    new_rank[suffix_array] = np.concatenate(([0], np.cumsum(changed)))
+    rank = new_rank
+
+    if rank.max() == n - 1 or h >= n:
+      return suffix_array
+    h *= 2
+
+
+class FMIndex:
+  '''
+  Full-text index of one genome: suffix array, BWT, first-column counts and sampled Occ table.
+  '''
+
+  def __init__(self, suffix_array, bwt, first_column, occ_samples):
+    self.suffix_array = suffix_array
+    self.bwt = bwt
+    self.first_column = first_column
+    self.occ_samples = occ_samples
+
+  def __len__(self):
+    # the sentinel is not part of the genome
+    return len(self.bwt) - 1
+
+  @classmethod
+  def build(cls, text):
+    '''
+    Builds the index of a genome held in memory.
+
+    Args:
+      text (str, bytes or PackedDNA): the genome
+
+    Returns:
+      index (FMIndex): the index of text
+    '''
+    symbols = encode_text(text)
+    n = len(symbols)
+    suffix_array = build_suffix_array(symbols)
+    suffix_array = suffix_array.astype(np.int32 if n < 2 ** 31 else np.int64)
+
+    # suffix_array - 1 wraps to the sentinel for the suffix starting at 0
+    bwt = symbols[suffix_array - 1]
+
+    counts = np.bincount(symbols, minlength=ALPHABET_SIZE)
+    first_column = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    sample_rows = np.arange(0, n + 1, OCC_SAMPLE_RATE)
+    occ_samples = np.zeros((len(sample_rows), ALPHABET_SIZE), dtype=np.int64)
+    for symbol in range(ALPHABET_SIZE):
+      running = np.concatenate(([0], np.cumsum(bwt == symbol)))
+      occ_samples[:, symbol] = running[sample_rows]
+
+    return cls(suffix_array, bwt, first_column, occ_samples)
+
+  def save(self, directory: str):
+    '''
+    Writes the index arrays as .npy files into directory.
+
+    Args:
+      directory (str): destination directory, created if missing
+    '''
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "suffix_array.npy"), self.suffix_array)
+    np.save(os.path.join(directory, "bwt.npy"), self.bwt)
+    np.save(os.path.join(directory, "first_column.npy"), self.first_column)
+    np.save(os.path.join(directory, "occ_samples.npy"), self.occ_samples)
+
+  @classmethod
+  def load(cls, directory: str):
+    '''
+    Memory-maps a saved index, so loading is instant and pages are shared between processes.
+
+    Args:
+      directory (str): directory written by save
+
+    Returns:
+      index (FMIndex): the loaded index
+    '''
+    def load_array(name):
+      return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+
+    return cls(load_array("suffix_array"),
+               load_array("bwt"),
+               np.array(load_array("first_column")),
+               load_array("occ_samples"))
+
+  def occ(self, symbol: int, i: int) -> int:
+    '''
+    Number of occurrences of symbol in bwt[:i].
+    '''
+    row = i // OCC_SAMPLE_RATE
+    start = row * OCC_SAMPLE_RATE
+    return int(self.occ_samples[row, symbol]) + int(np.count_nonzero(self.bwt[start:i] == symbol))
+
+  def suffix_range(self, pattern: str) -> tuple:
+    '''
+    Backward search for pattern.
+
+    Args:
+      pattern (str): the pattern to search for
+
+    Returns:
+      (top, bottom) (tuple): half-open range of suffix array rows whose suffixes start with pattern
+    '''
+    top, bottom = 0, len(self.bwt)
+    for symbol in encode_text(pattern)[-2::-1]:
+      top = int(self.first_column[symbol]) + self.occ(symbol, top)
+      bottom = int(self.first_column[symbol]) + self.occ(symbol, bottom)
+      if top >= bottom:
+        return 0, 0
+    return top, bottom
+
+  def count(self, pattern: str) -> int:
+    '''
+    Counts the (possibly overlapping) occurrences of pattern in the genome.
+    '''
+    top, bottom = self.suffix_range(pattern)
+    return bottom - top
+
+  def find(self, pattern: str) -> np.ndarray:
+    '''
+    Finds every start position of pattern in the genome.
+
+    Args:
+      pattern (str): the pattern to search for
+
+    Returns:
+      positions (np.ndarray): sorted 0-based start positions
+    '''
+    top, bottom = self.suffix_range(pattern)
+    return np.sort(np.asarray(self.suffix_array[top:bottom], dtype=np.int64))
+
+
+def file_digest(path: str) -> str:
+  sha1 = hashlib.sha1()
+  with open(path, "rb") as file:
+    for block in iter(lambda: file.read(1 << 20), b""):
+      sha1.update(block)
+  return sha1.hexdigest()
+
+
+def load_or_build_fm_index(genome_path: str, index_dir: str = None) -> FMIndex:
+  '''
+  Returns the index of a genome file, building and saving it next to the genome the first time.
+  The saved index is rebuilt whenever the genome file content changes.
+
+  Args:
+    genome_path (str): genome file, either FASTA or raw sequence
+    index_dir (str): where to keep the index, defaults to <genome_path>.fmi
+
+  Returns:
+    index (FMIndex): memory-mapped index of the genome
+  '''
+  if index_dir is None:
+    index_dir = genome_path + ".fmi"
+  meta_path = os.path.join(index_dir, "meta.json")
+  digest = file_digest(genome_path)
+
+  if os.path.exists(meta_path):
+    with open(meta_path, "r") as file:
+      if json.load(file).get("sha1") == digest:
+        return FMIndex.load(index_dir)
+
+  genome = read_genome(genome_path)
+  FMIndex.build(genome).save(index_dir)
+  with open(meta_path, "w") as file:
+    json.dump({"sha1": digest, "length": len(genome)}, file)
+  return FMIndex.load(index_dir)
@@ -0,0 +1,145 @@
+# GC skew (count of G minus count of C in every prefix) as vectorized lookups and a cumsum.
+# compute_skew returns the whole int32 series; SkewTracker consumes a genome chunk by chunk,
+# carrying the running value, and keeps only the extrema and a min/max-per-bucket envelope,
+# which is all a multi-megabase genome needs for finding ori and for plotting.
+import numpy as np
+
+from kmer_codec import BASE_LETTERS
+from packed_dna import PackedDNA
+
+# points of the series kept per plotted envelope by default
+ENVELOPE_POINTS = 4096
+
+
+def skew_steps(a: str = "G", b: str = "C") -> np.ndarray:
+  '''
+  Lookup table from a byte to its skew step: +1 for a, -1 for b (either case), 0 otherwise.
+  '''
+  steps = np.zeros(256, dtype=np.int8)
+  for base, step in ((a, 1), (b, -1)):
+    steps[ord(base.upper())] = step
+    steps[ord(base.lower())] = step
+  return steps
+
+
+def sequence_steps(sequence, steps: np.ndarray) -> np.ndarray:
+  '''
+  Skew step of every base of a sequence (str, bytes or PackedDNA) through a skew_steps table.
+  '''
+  if isinstance(sequence, PackedDNA):
+    return steps[BASE_LETTERS][sequence.codes()]
+  if isinstance(sequence, str):
+    sequence = sequence.encode("ascii")
+  return steps[np.frombuffer(sequence, dtype=np.uint8)]
+
+
+def compute_skew(sequence, a: str = "G", b: str = "C") -> np.ndarray:
+  '''
+  Skew of every prefix of a sequence.
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence
+    a (str): base counted as +1
+    b (str): base counted as -1
+
+  Returns:
+    skew (np.ndarray): int32 array of length len(sequence) + 1, skew[i] covers the first i bases
+  '''
+  skew = np.zeros(len(sequence) + 1, dtype=np.int32)
+  np.cumsum(sequence_steps(sequence, skew_steps(a, b)), dtype=np.int32, out=skew[1:])
+  return skew
+
+
+def skew_envelope(skew: np.ndarray, bucket_size: int) -> tuple:
+  '''
+  Downsamples a skew series to the minimum and maximum of every bucket of bucket_size points,
+  so a plot of the envelope shows every excursion of the full series.
+
+  Returns:
+    (starts, lows, highs) (tuple): first position, minimum and maximum of each bucket
+  '''
+  full = len(skew) // bucket_size * bucket_size
+  buckets = skew[:full].reshape(-1, bucket_size)
+  lows, highs = buckets.min(axis=1), buckets.max(axis=1)
+  if full < len(skew):
+    lows = np.append(lows, skew[full:].min())
+    highs = np.append(highs, skew[full:].max())
+  return np.arange(len(lows)) * bucket_size, lows, highs
+
+
+def envelope_bucket_size(length: int, points: int = ENVELOPE_POINTS) -> int:
+  return max(-(-length // points), 1)
+
+
+class SkewTracker:
+  '''
+  Streaming skew of a sequence fed chunk by chunk, with positions indexed as in compute_skew.
+
+  Attributes:
+    length (int): number of bases consumed
+    running (int): skew of everything consumed so far
+    minimum (int): lowest skew value so far
+    minima (list): every position where the minimum is reached
+    maximum (int): highest skew value so far
+    maxima (list): every position where the maximum is reached
+    lows (list): arrays of per-bucket minima of the full buckets, when bucket_size is set
+    highs (list): arrays of per-bucket maxima of the full buckets, when bucket_size is set
+  '''
+
+  def __init__(self, a: str = "G", b: str = "C", bucket_size: int = None):
+    self.steps = skew_steps(a, b)
+    self.bucket_size = bucket_size
+    self.length = 0
+    self.running = 0
+    self.minimum = self.maximum = 0
+    self.minima = [0]
+    self.maxima = [0]
+    self.lows = []
+    self.highs = []
+    self.pending = np.zeros(1, dtype=np.int32)
+
+  def update(self, chunk):
+    '''
+    Consumes the next chunk of sequence (str, bytes or PackedDNA).
+    '''
+    if len(chunk) == 0:
+      return
+    skew = np.cumsum(sequence_steps(chunk, self.steps), dtype=np.int32)
+    skew += np.int32(self.running)
+    first = self.length + 1
+
+    chunk_minimum, chunk_maximum = int(skew.min()), int(skew.max())
+    if chunk_minimum < self.minimum:
+      self.minimum, self.minima = chunk_minimum, []
+    if chunk_minimum == self.minimum:
+      self.minima.extend((first + np.flatnonzero(skew == chunk_minimum)).tolist())
+    if chunk_maximum > self.maximum:
+      self.maximum, self.maxima = chunk_maximum, []
+    if chunk_maximum == self.maximum:
+      self.maxima.extend((first + np.flatnonzero(skew == chunk_maximum)).tolist())
+
+    if self.bucket_size:
+      values = np.concatenate((self.pending, skew))
+      full = len(values) // self.bucket_size * self.bucket_size
+      if full:
+        buckets = values[:full].reshape(-1, self.bucket_size)
+        self.lows.append(buckets.min(axis=1))
+        self.highs.append(buckets.max(axis=1))
+      self.pending = values[full:]
+
+    self.length += len(chunk)
+    self.running = int(skew[-1])
+
+  def envelope(self) -> tuple:
+    '''
+    The min/max-per-bucket downsampled series of everything consumed so far, as skew_envelope
+    returns it.
+    '''
+    if not self.bucket_size:
+      raise ValueError("SkewTracker was created without a bucket_size")
+    lows, highs = list(self.lows), list(self.highs)
+    if len(self.pending):
+      lows.append(self.pending.min(keepdims=True))
+      highs.append(self.pending.max(keepdims=True))
+    lows, highs = np.concatenate(lows), np.concatenate(highs)
+    return np.arange(len(lows)) * self.bucket_size, lows, highs
@@ -0,0 +1,206 @@
+# Streams the bases of a genome file (FASTA or raw sequence) through a memory map, so genomes
+# larger than RAM can be scanned in fixed-size chunks with bounded memory.
+import mmap
+import os
+
+import numpy as np
+
+from gc_skew import SkewTracker
+from hamming import window_distances
+from kmer_codec import number_to_pattern, window_codes
+
+WHITESPACE = b" \t\r\n"
+UPPERCASE = bytes(range(256)).upper()
+BLOCK_SIZE = 1 << 22
+CHUNK_SIZE = 1 << 24
+# base placed between FASTA records in genome coordinates, so no match or k-mer spans two
+RECORD_SEPARATOR = b"N"
+
+
+def iter_sequence_blocks(path: str, block_size: int = BLOCK_SIZE):
+  '''
+  Yields the sequence text of a genome file block by block, with FASTA header lines and
+  whitespace removed and bases upper-cased. Every line starting with '>' starts a new record.
+
+  Args:
+    path (str): genome file, either FASTA or raw sequence lines
+    block_size (int): number of file bytes read per step
+
+  Yields:
+    (record, block) (tuple): 0-based record number and a piece of its sequence as bytes
+  '''
+  with open(path, "rb") as file:
+    size = os.fstat(file.fileno()).st_size
+    if size == 0:
+      return
+
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as genome:
+      record = 0
+      record_has_bases = False
+      position = 0
+
+      while position < size:
+        if genome[position:position + 1] == b">":
+          if record_has_bases:
+            record += 1
+            record_has_bases = False
+          newline = genome.find(b"\n", position)
+          position = size if newline == -1 else newline + 1
+          continue
+
+        end = min(position + block_size, size)
+        header = genome.find(b"\n>", position, end)
+        if header != -1:
+          end = header + 1
+
+        block = genome[position:end].translate(UPPERCASE, WHITESPACE)
+        if block:
+          record_has_bases = True
+          yield record, block
+        position = end
+
+
+def iter_genome_chunks(path: str, chunk_size: int = CHUNK_SIZE, overlap: int = 0):
+  '''
+  Yields the genome as chunks of at most chunk_size bases, each repeating the last overlap
+  bases of the previous chunk. With overlap = k - 1 every k-mer lies inside exactly one chunk,
+  so per-chunk results can simply be added up. Chunks never span two FASTA records; positions
+  count one RECORD_SEPARATOR between records, as in read_genome.
+
+  Args:
+    path (str): genome file, either FASTA or raw sequence lines
+    chunk_size (int): maximum number of bases per chunk
+    overlap (int): number of bases shared by consecutive chunks
+
+  Yields:
+    (start, chunk) (tuple): position of the chunk's first base in the genome and its bases as bytes
+  '''
+  if overlap >= chunk_size:
+    raise ValueError(f"overlap ({overlap}) must be smaller than chunk_size ({chunk_size})")
+
+  buffer = bytearray()
+  start = 0
+  unseen = 0
+  current_record = 0
+
+  for record, block in iter_sequence_blocks(path):
+    if record != current_record:
+      if unseen:
+        yield start, bytes(buffer)
+      start += len(buffer) + len(RECORD_SEPARATOR)
+      buffer.clear()
+      unseen = 0
+      current_record = record
+
+    buffer += block
+    unseen += len(block)
+
+    while len(buffer) >= chunk_size:
+      yield start, bytes(buffer[:chunk_size])
+      del buffer[:chunk_size - overlap]
+      start += chunk_size - overlap
+      unseen = len(buffer) - overlap
+
+  if unseen:
+    yield start, bytes(buffer)
+
+
+def read_genome(path: str) -> str:
+  '''
+  Reads a whole genome file (FASTA or raw sequence) into one upper-case string, with a
+  RECORD_SEPARATOR between FASTA records so nothing built on it matches across two records.
+  '''
+  records = {}
+  for record, block in iter_sequence_blocks(path):
+    records.setdefault(record, []).append(block)
+  return RECORD_SEPARATOR.join(b"".join(blocks) for blocks in records.values()).decode("ascii")
+
+
+def stream_frequency_table(path: str, k: int, chunk_size: int = CHUNK_SIZE) -> dict:
+  '''
+  Counts every k-mer of a genome file chunk by chunk. Windows containing a non-ACGT base
+  are skipped. Memory is bounded by chunk_size plus one counter per distinct k-mer.
+
+  Args:
+    path (str): genome file
+    k (int): length of the k-mer
+    chunk_size (int): number of bases processed at a time
+
+  Returns:
+    freqMap (dict): maps each k-mer to its number of occurrences
+  '''
+  counts = {}
+  for _, chunk in iter_genome_chunks(path, chunk_size, k - 1):
+    codes, _ = window_codes(chunk, k)
+    unique_codes, chunk_counts = np.unique(codes, return_counts=True)
+    for code, count in zip(unique_codes.tolist(), chunk_counts.tolist()):
+      counts[code] = counts.get(code, 0) + count
+
+  return {number_to_pattern(code, k): count for code, count in counts.items()}
+
+
+def stream_find_pattern(path: str, pattern: str, chunk_size: int = CHUNK_SIZE):
+  '''
+  Yields every start position of pattern in a genome file.
+  '''
+  pattern = pattern.strip().upper().encode("ascii")
+  for start, chunk in iter_genome_chunks(path, chunk_size, len(pattern) - 1):
+    i = chunk.find(pattern)
+    while i != -1:
+      yield start + i
+      i = chunk.find(pattern, i + 1)
+
+
+def stream_approximate_patterns(path: str, pattern: str, d: int, chunk_size: int = CHUNK_SIZE):
+  '''
+  Yields every start position of a window within Hamming distance d of pattern in a genome file.
+  Non-ACGT bases in the genome count as mismatches.
+  '''
+  pattern = pattern.strip().upper()
+  for start, chunk in iter_genome_chunks(path, chunk_size, len(pattern) - 1):
+    for i in np.flatnonzero(window_distances(pattern, chunk) <= d).tolist():
+      yield start + i
+
+
+def stream_skew(path: str, a: str = "G", b: str = "C", chunk_size: int = CHUNK_SIZE,
+                bucket_size: int = None) -> SkewTracker:
+  '''
+  Runs the skew of a genome file through a SkewTracker chunk by chunk, keeping its extrema
+  (and a min/max envelope of bucket_size-point buckets) without the full skew array.
+
+  Args:
+    path (str): genome file
+    a (str): base counted as +1
+    b (str): base counted as -1
+    chunk_size (int): number of bases processed at a time
+    bucket_size (int): points per envelope bucket, None for no envelope
+
+  Returns:
+    tracker (SkewTracker): extrema, their positions and the envelope of the whole genome
+  '''
+  tracker = SkewTracker(a, b, bucket_size)
+  for start, chunk in iter_genome_chunks(path, chunk_size):
+    # the separator between records steps the position but not the skew
+    if start > tracker.length:
+      tracker.update(RECORD_SEPARATOR)
+    tracker.update(chunk)
+  return tracker
+
+
+def stream_skew_minima(path: str, a: str = "G", b: str = "C", chunk_size: int = CHUNK_SIZE) -> tuple:
+  '''
+  Finds the minimum of the skew (count of a minus count of b in each prefix) of a genome file
+  without keeping the skew array. Positions use the same indexing as computeSkew, where
+  skew[i] covers the first i bases.
+
+  Args:
+    path (str): genome file
+    a (str): base counted as +1
+    b (str): base counted as -1
+    chunk_size (int): number of bases processed at a time
+
+  Returns:
+    (minimum, positions) (tuple): minimum skew value and every position where it is reached
+  '''
+  tracker = stream_skew(path, a, b, chunk_size)
+  return tracker.minimum, tracker.minima
@@ -0,0 +1,162 @@
+# Batch Hamming distances over integer-encoded DNA. k-mers are 2-bit packed uint64 codes
+# (k <= 32): XOR-ing two codes leaves a non-zero 2-bit group exactly where the bases differ,
+# so folding each group onto its low bit and counting the set bits gives the distance of a
+# whole k-mer pair in a handful of word operations, broadcast over whole arrays.
+import numpy as np
+
+from kmer_codec import sequence_codes, window_codes
+from packed_dna import PackedDNA
+
+LOW_BITS = np.uint64(0x5555555555555555)
+BYTE_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+# pattern x window distances computed at once when scoring patterns against a DNA set; small
+# enough for the uint64 temporaries to stay in cache, which beats fewer, larger blocks
+DISTANCE_BLOCK_CELLS = 1 << 16
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+  '''
+  Number of set bits of every uint64 word.
+  '''
+  if hasattr(np, "bitwise_count"):
+    return np.bitwise_count(words)
+  words = np.ascontiguousarray(words, dtype=np.uint64)
+  return BYTE_POPCOUNT[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def code_distances(codes_a: np.ndarray, codes_b: np.ndarray) -> np.ndarray:
+  '''
+  Element-wise Hamming distance of two broadcastable arrays of k-mer codes of the same k.
+
+  Args:
+    codes_a (np.ndarray): uint64 k-mer codes
+    codes_b (np.ndarray): uint64 k-mer codes
+
+  Returns:
+    distances (np.ndarray): uint8 number of differing bases of each pair
+  '''
+  differences = np.bitwise_xor(np.asarray(codes_a, dtype=np.uint64), np.asarray(codes_b, dtype=np.uint64))
+  return popcount((differences | (differences >> np.uint64(1))) & LOW_BITS).astype(np.uint8)
+
+
+def hamming_distance(sequence1: str, sequence2: str) -> int:
+  '''
+  Number of positions at which two equal-length sequences differ (any length, any letters,
+  str, bytes or PackedDNA).
+  '''
+  if len(sequence1) != len(sequence2):
+    raise ValueError("Hamming distance is only defined for sequences of equal length")
+  if isinstance(sequence1, PackedDNA) or isinstance(sequence2, PackedDNA):
+    return int((sequence_codes(sequence1) != sequence_codes(sequence2)).sum())
+  if isinstance(sequence1, str):
+    sequence1, sequence2 = sequence1.encode("ascii"), sequence2.encode("ascii")
+  return int((np.frombuffer(sequence1, dtype=np.uint8) != np.frombuffer(sequence2, dtype=np.uint8)).sum())
+
+
+def window_distances(pattern: str, sequence) -> np.ndarray:
+  '''
+  Hamming distance from a pattern to every window of a sequence, one vectorized comparison
+  per pattern position. Any character other than A, C, G or T counts as a mismatch.
+
+  Args:
+    pattern (str): the pattern
+    sequence (str, bytes or PackedDNA): the sequence
+
+  Returns:
+    distances (np.ndarray): entry i is the distance to sequence[i:i + len(pattern)]
+  '''
+  codes = sequence_codes(sequence.strip() if isinstance(sequence, str) else sequence)
+  pattern = sequence_codes(pattern.strip())
+  windows = max(len(codes) - len(pattern) + 1, 0)
+
+  distances = np.zeros(windows, dtype=np.int32)
+  for j, base in enumerate(pattern.tolist()):
+    distances += codes[j:j + windows] != base
+  return distances
+
+
+def distance_matrix(codes_a: np.ndarray, codes_b: np.ndarray) -> np.ndarray:
+  '''
+  Many-vs-many Hamming distances between two sets of k-mer codes of the same k.
+  Memory is len(codes_a) x len(codes_b) bytes.
+
+  Returns:
+    distances (np.ndarray): uint8 matrix, distances[i, j] is the distance of codes_a[i] to codes_b[j]
+  '''
+  return code_distances(np.asarray(codes_a, dtype=np.uint64)[:, None], np.asarray(codes_b, dtype=np.uint64)[None, :])
+
+
+def pairwise_distances(codes: np.ndarray) -> np.ndarray:
+  '''
+  All-vs-all Hamming distances within one set of k-mer codes (a symmetric matrix).
+  '''
+  return distance_matrix(codes, codes)
+
+
+def sequence_windows(dna: list, k: int) -> list:
+  '''
+  Distinct codes of the length-k windows of each sequence (windows with non-ACGT bases are
+  ignored), the only part of a sequence that d(Pattern, Dna) depends on.
+  '''
+  return [np.unique(window_codes(sequence.strip(), k)[0]) for sequence in dna]
+
+
+def block_distances(pattern_codes: np.ndarray, k: int, windows: list) -> np.ndarray:
+  '''
+  d(Pattern, Dna) of one block of patterns against the sequence_windows of a DNA set.
+  '''
+  total = np.zeros(len(pattern_codes), dtype=np.int64)
+  for codes in windows:
+    total += distance_matrix(pattern_codes, codes).min(axis=1, initial=k)
+  return total
+
+
+def pattern_block_size(windows: list, block_cells: int) -> int:
+  return max(block_cells // max(max((len(codes) for codes in windows), default=1), 1), 1)
+
+
+def distances_to_sequences(pattern_codes: np.ndarray, k: int, dna: list,
+                           block_cells: int = DISTANCE_BLOCK_CELLS) -> np.ndarray:
+  '''
+  d(Pattern, Dna) for many patterns at once: for every pattern, the sum over the sequences of
+  the smallest Hamming distance to any of the sequence's k-mers (windows with non-ACGT bases
+  are ignored). Patterns are scored in blocks, so at most block_cells distances exist at once.
+
+  Args:
+    pattern_codes (np.ndarray): uint64 codes of the patterns
+    k (int): length of the patterns
+    dna (list): the sequences
+    block_cells (int): memory budget of one block of the pattern x window distance matrix
+
+  Returns:
+    distances (np.ndarray): int64 distance of each pattern to the whole collection
+  '''
+  pattern_codes = np.asarray(pattern_codes, dtype=np.uint64)
+  windows = sequence_windows(dna, k)
+  block = pattern_block_size(windows, block_cells)
+  total = np.zeros(len(pattern_codes), dtype=np.int64)
+  for start in range(0, len(pattern_codes), block):
+    total[start:start + block] = block_distances(pattern_codes[start:start + block], k, windows)
+  return total
+
+
+def all_distances_to_sequences(k: int, dna: list, block_cells: int = DISTANCE_BLOCK_CELLS) -> np.ndarray:
+  '''
+  d(Pattern, Dna) of every one of the 4^k k-mers, generating the codes block by block.
+
+  Args:
+    k (int): length of the k-mers
+    dna (list): the sequences
+    block_cells (int): memory budget of one block of the pattern x window distance matrix
+
+  Returns:
+    distances (np.ndarray): int64 array of length 4^k indexed by k-mer code, so its argmin is
+      the lexicographically first median string
+  '''
+  windows = sequence_windows(dna, k)
+  block = pattern_block_size(windows, block_cells)
+  total = np.zeros(4 ** k, dtype=np.int64)
+  for start in range(0, 4 ** k, block):
+    end = min(start + block, 4 ** k)
+    total[start:end] = block_distances(np.arange(start, end, dtype=np.uint64), k, windows)
+  return total
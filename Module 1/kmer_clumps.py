@@ -0,0 +1,134 @@
+# Finds (L, t)-clumps of k-mers: k-mers that appear at least t times in some window of length L.
+from array import array
+
+import numpy as np
+
+from kmer_codec import number_to_pattern
+from packed_dna import PackedDNA
+
+# 4^12 counters take 64 MB as uint32, beyond that the counts go into a dict
+DENSE_MAX_K = 12
+
+
+def as_packed(genome) -> PackedDNA:
+  if isinstance(genome, PackedDNA):
+    return genome
+  return PackedDNA.from_string(genome)
+
+
+def find_clumps(genome, k: int, L: int, t: int) -> set:
+  '''
+  Finds every k-mer forming an (L, t)-clump in one left-to-right pass.
+  When the window slides by one base exactly one k-mer leaves and one enters, and only the
+  entering k-mer can newly reach t, so it is the only count that needs checking.
+
+  Args:
+    genome (str or PackedDNA): the genome
+    k (int): length of the k-mer
+    L (int): length of the window
+    t (int): minimum number of occurrences inside one window
+
+  Returns:
+    clumps (set): k-mers (as strings) forming clumps
+  '''
+  k, L, t = int(k), int(L), int(t)
+  codes = as_packed(genome).kmer_codes(k).tolist()
+  kmers_per_window = L - k + 1
+
+  clump_codes = set()
+
+  if k <= DENSE_MAX_K:
+    counts = array("I", [0]) * (4 ** k)
+    for i, code in enumerate(codes):
+      if i >= kmers_per_window:
+        counts[codes[i - kmers_per_window]] -= 1
+      counts[code] += 1
+      if counts[code] >= t:
+        clump_codes.add(code)
+
+  else:
+    counts = {}
+    for i, code in enumerate(codes):
+      if i >= kmers_per_window:
+        outgoing = codes[i - kmers_per_window]
+        counts[outgoing] -= 1
+        if counts[outgoing] == 0:
+          del counts[outgoing]
+      counts[code] = counts.get(code, 0) + 1
+      if counts[code] >= t:
+        clump_codes.add(code)
+
+  return {number_to_pattern(code, k) for code in clump_codes}
+
+
+def group_positions_by_code(codes: np.ndarray) -> tuple:
+  '''
+  Sorts the window codes so every k-mer's occurrences are contiguous and in genome order.
+
+  Args:
+    codes (np.ndarray): code of the k-mer starting at each position
+
+  Returns:
+    (sorted_codes, positions) (tuple): codes in sorted order and the position each came from
+  '''
+  positions = np.argsort(codes, kind="stable")
+  return codes[positions], positions
+
+
+def min_clump_spans(sorted_codes: np.ndarray, positions: np.ndarray, t: int) -> tuple:
+  '''
+  For every k-mer occurring at least t times, the smallest distance between the starts of
+  occurrences j and j + t - 1. The k-mer forms an (L, t)-clump exactly when that span is <= L - k.
+
+  Args:
+    sorted_codes (np.ndarray): output of group_positions_by_code
+    positions (np.ndarray): output of group_positions_by_code
+    t (int): minimum number of occurrences
+
+  Returns:
+    (codes, spans) (tuple): k-mer codes and their smallest t-occurrence span
+  '''
+  runs = len(sorted_codes) - t + 1
+  if runs <= 0:
+    return sorted_codes[:0], positions[:0]
+
+  same_kmer = sorted_codes[t - 1:] == sorted_codes[:runs]
+  codes = sorted_codes[:runs][same_kmer]
+  spans = (positions[t - 1:] - positions[:runs])[same_kmer]
+  if len(codes) == 0:
+    return codes, spans
+
+  group_starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+  return codes[group_starts], np.minimum.reduceat(spans, group_starts)
+
+
+def find_clumps_grid(genome, ks: list, Ls: list, ts: list) -> dict:
+  '''
+  Finds the clumps for every (k, L, t) combination of a parameter grid in one shared pass.
+  The k-mer codes and their sorted position lists are computed once per k, the smallest
+  t-occurrence span of every k-mer once per (k, t), and each L is then a single comparison
+  against those spans, so L values come almost for free.
+
+  Args:
+    genome (str or PackedDNA): the genome
+    ks (list): k-mer lengths
+    Ls (list): window lengths
+    ts (list): occurrence thresholds
+
+  Returns:
+    clumps (dict): maps (k, L, t) to the set of k-mers forming (L, t)-clumps
+  '''
+  packed = as_packed(genome)
+  clumps = {}
+
+  for k in ks:
+    sorted_codes, positions = group_positions_by_code(packed.kmer_codes(k))
+
+    for t in ts:
+      codes, spans = min_clump_spans(sorted_codes, positions, t)
+
+      for L in Ls:
+        clump_codes = codes[spans <= L - k]
+        clumps[(k, L, t)] = {number_to_pattern(code, k) for code in clump_codes.tolist()}
+
+  return clumps
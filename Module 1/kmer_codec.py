@@ -0,0 +1,141 @@
+# Integer encoding of DNA k-mers (A=0, C=1, G=2, T=3, two bits per base, first base in the
+# most significant bits, k <= 32 in one uint64). PatternToNumber / NumberToPattern for single
+# k-mers, a rolling encoder giving the code of every window of a sequence in O(n log k)
+# vectorized work, and batch decoding back to strings for output only.
+import numpy as np
+
+BASES = "ACGT"
+BASE_LETTERS = np.frombuffer(BASES.encode("ascii"), dtype=np.uint8)
+INVALID_CODE = 255
+MAX_K = 32
+
+BASE_CODES = np.full(256, INVALID_CODE, dtype=np.uint8)
+for code, base in enumerate(BASES):
+  BASE_CODES[ord(base)] = code
+  BASE_CODES[ord(base.lower())] = code
+
+
+def sequence_codes(sequence, strict: bool = False) -> np.ndarray:
+  '''
+  Converts a DNA sequence to an array of 2-bit base codes, the one conversion every module
+  working on base codes goes through. The sequence is taken as is, callers strip it.
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence (either case)
+    strict (bool): raise ValueError on a character other than A, C, G or T instead of
+      mapping it to INVALID_CODE
+
+  Returns:
+    codes (np.ndarray): uint8 array with one code per base
+  '''
+  # packed_dna imports this module, so PackedDNA is only looked up once both are loaded
+  from packed_dna import PackedDNA
+
+  if isinstance(sequence, PackedDNA):
+    return sequence.codes()
+  if isinstance(sequence, str):
+    sequence = sequence.encode("ascii")
+  codes = BASE_CODES[np.frombuffer(sequence, dtype=np.uint8)]
+  if strict and len(codes) and codes.max() == INVALID_CODE:
+    position = int(np.argmax(codes == INVALID_CODE))
+    raise ValueError(f"Invalid DNA base {chr(sequence[position])!r} at position {position}")
+  return codes
+
+
+def pattern_to_number(pattern: str) -> int:
+  '''
+  PatternToNumber: the integer code of one k-mer made of A, C, G and T.
+
+  Args:
+    pattern (str): the k-mer, 1 to 32 bases
+
+  Returns:
+    code (int): its code, between 0 and 4^k - 1
+  '''
+  pattern = pattern.strip()
+  if not 0 < len(pattern) <= MAX_K:
+    raise ValueError(f"k-mers must be 1 to {MAX_K} bases long, got {len(pattern)}")
+  code = 0
+  for base in sequence_codes(pattern, strict=True).tolist():
+    code = (code << 2) | base
+  return code
+
+
+def number_to_pattern(code: int, k: int) -> str:
+  '''
+  NumberToPattern: converts an integer k-mer code back to its string.
+  '''
+  return "".join(BASES[(int(code) >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+
+def decode_kmers(codes: np.ndarray, k: int) -> list:
+  '''
+  Converts an array of integer k-mer codes back to strings in one vectorized pass.
+  '''
+  shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint64)
+  digits = (np.asarray(codes, dtype=np.uint64)[:, None] >> shifts) & np.uint64(3)
+  letters = np.ascontiguousarray(BASE_LETTERS[digits.astype(np.intp)])
+  return letters.view(f"S{k}").ravel().astype(str).tolist()
+
+
+def rolling_kmer_codes(codes: np.ndarray, k: int) -> np.ndarray:
+  '''
+  Integer codes of every length-k window of an array of base codes. Window codes of length
+  a and b combine into length a + b as (code_a[i] << 2b) | code_b[i + a], so doubling the
+  block length and adding the blocks of k's binary digits takes about 2 log2(k) vectorized
+  passes over the array.
+
+  Args:
+    codes (np.ndarray): one base code (0-3) per base
+    k (int): window length, at most 32
+
+  Returns:
+    kmer_codes (np.ndarray): uint64 array, entry i is the code of the window starting at i
+  '''
+  if not 0 < k <= MAX_K:
+    raise ValueError(f"k must be between 1 and {MAX_K}, got {k}")
+  if len(codes) < k:
+    return np.zeros(0, dtype=np.uint64)
+
+  block, block_length = codes.astype(np.uint64), 1
+  kmer_codes, length = None, 0
+  remaining = k
+  while True:
+    if remaining & 1:
+      if kmer_codes is None:
+        kmer_codes, length = block, block_length
+      else:
+        windows = len(codes) - length - block_length + 1
+        kmer_codes = (kmer_codes[:windows] << np.uint64(2 * block_length)) | block[length:length + windows]
+        length += block_length
+    remaining >>= 1
+    if not remaining:
+      return kmer_codes
+    windows = len(codes) - 2 * block_length + 1
+    block = (block[:windows] << np.uint64(2 * block_length)) | block[block_length:block_length + windows]
+    block_length *= 2
+
+
+def window_codes(sequence, k: int) -> tuple:
+  '''
+  Integer codes of the length-k windows of raw sequence text, skipping every window
+  that contains a character other than A, C, G or T (N runs, IUPAC codes, ...).
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence
+    k (int): window length, at most 32
+
+  Returns:
+    (kmer_codes, positions) (tuple): codes of the valid windows and their start positions
+  '''
+  codes = sequence_codes(sequence)
+  invalid = codes == INVALID_CODE
+  positions = np.arange(max(len(codes) - k + 1, 0))
+
+  if not invalid.any():
+    return rolling_kmer_codes(codes, k), positions
+
+  invalid_before = np.concatenate(([0], np.cumsum(invalid)))
+  valid = invalid_before[k:] == invalid_before[:len(positions)]
+  kmer_codes = rolling_kmer_codes(np.where(invalid, 0, codes), k)
+  return kmer_codes[valid], positions[valid]
@@ -0,0 +1,214 @@
+# Exact k-mer counting over integer k-mer codes: a dense 4^k array filled by np.bincount for
+# small k, sorted codes with run lengths for larger k. No per-k-mer Python strings are built,
+# k-mers are only decoded for the answers that are returned.
+import os
+
+import numpy as np
+
+from genome_reader import CHUNK_SIZE, iter_genome_chunks
+from kmer_codec import number_to_pattern, window_codes
+from packed_dna import PackedDNA
+from reverse_complement import canonical_codes, reverse_complement_codes
+
+# 4^14 int64 counters take 2 GB, larger k switches to sorted codes
+DENSE_MAX_K = 14
+# a dense table far larger than the input is slower to scan than sorting the input's codes
+DENSE_MAX_TABLE_PER_WINDOW = 64
+
+
+def sequence_kmer_codes(sequence, k: int) -> np.ndarray:
+  '''
+  Codes of every length-k window of a str, bytes or PackedDNA (windows with non-ACGT bases skipped).
+  '''
+  if isinstance(sequence, PackedDNA):
+    return sequence.kmer_codes(k)
+  if isinstance(sequence, str):
+    sequence = sequence.strip()
+  codes, _ = window_codes(sequence, k)
+  return codes
+
+
+def run_lengths(sorted_codes: np.ndarray) -> tuple:
+  '''
+  Collapses a sorted code array into its distinct codes and how often each occurs.
+  '''
+  if len(sorted_codes) == 0:
+    return sorted_codes, np.zeros(0, dtype=np.int64)
+  starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+  counts = np.diff(np.append(starts, len(sorted_codes)))
+  return sorted_codes[starts], counts
+
+
+class KmerCounts:
+  '''
+  Exact k-mer counts, stored densely (one counter per possible k-mer) or sparsely
+  (sorted distinct codes with their counts). In canonical mode every k-mer is counted
+  under the smaller of its own code and its reverse complement's code, so one table
+  holds the counts of both strands.
+
+  Attributes:
+    k (int): length of the k-mers
+    dense (np.ndarray): counts indexed by k-mer code, or None in sparse mode
+    codes (np.ndarray): sorted distinct k-mer codes in sparse mode
+    counts (np.ndarray): count of each entry of codes in sparse mode
+    canonical (bool): whether the counts are keyed by canonical codes
+  '''
+
+  def __init__(self, k: int, dense: np.ndarray = None, codes: np.ndarray = None, counts: np.ndarray = None,
+               canonical: bool = False):
+    self.k = k
+    self.dense = dense
+    self.codes = codes
+    self.counts = counts
+    self.canonical = canonical
+
+  @classmethod
+  def from_codes(cls, kmer_codes: np.ndarray, k: int, dense: bool = None, canonical: bool = False):
+    '''
+    Counts an array of k-mer codes.
+
+    Args:
+      kmer_codes (np.ndarray): codes of the k-mers to count
+      k (int): length of the k-mers
+      dense (bool): force the dense or sparse layout, by default dense when k <= DENSE_MAX_K
+        and the 4^k table is not much larger than the input
+      canonical (bool): count each k-mer under its canonical code
+
+    Returns:
+      counts (KmerCounts): the counts
+    '''
+    if canonical:
+      kmer_codes = canonical_codes(kmer_codes, k)
+    if dense is None:
+      dense = k <= DENSE_MAX_K and 4 ** k <= DENSE_MAX_TABLE_PER_WINDOW * max(len(kmer_codes), 1)
+    if dense:
+      return cls(k, dense=np.bincount(kmer_codes.astype(np.int64), minlength=4 ** k), canonical=canonical)
+    codes, counts = run_lengths(np.sort(kmer_codes))
+    return cls(k, codes=codes, counts=counts, canonical=canonical)
+
+  def merge(self, other):
+    '''
+    Adds the counts of other (same k) into this KmerCounts, used to combine genome chunks.
+    '''
+    if self.dense is not None:
+      if other.dense is not None:
+        self.dense += other.dense
+      else:
+        np.add.at(self.dense, other.codes.astype(np.int64), other.counts)
+      return self
+
+    other_codes, other_counts = other.nonzero()
+    codes = np.concatenate((self.codes, other_codes))
+    counts = np.concatenate((self.counts, other_counts))
+    order = np.argsort(codes, kind="stable")
+    self.codes, self.counts = codes[order], counts[order]
+    if len(self.codes):
+      starts = np.flatnonzero(np.concatenate(([True], self.codes[1:] != self.codes[:-1])))
+      self.codes, self.counts = self.codes[starts], np.add.reduceat(self.counts, starts)
+    return self
+
+  def nonzero(self) -> tuple:
+    '''
+    Distinct observed k-mer codes (ascending) and their counts.
+    '''
+    if self.dense is not None:
+      codes = np.flatnonzero(self.dense)
+      return codes.astype(np.uint64), self.dense[codes]
+    return self.codes, self.counts
+
+  def count(self, kmer: str) -> int:
+    '''
+    Number of occurrences of one k-mer.
+    '''
+    kmer_codes = sequence_kmer_codes(kmer, self.k)
+    if len(kmer) != self.k or len(kmer_codes) == 0:
+      return 0
+    code = int(kmer_codes[0])
+    if self.canonical:
+      code = min(code, reverse_complement_codes(code, self.k))
+    if self.dense is not None:
+      return int(self.dense[code])
+    i = int(np.searchsorted(self.codes, np.uint64(code)))
+    if i < len(self.codes) and int(self.codes[i]) == code:
+      return int(self.counts[i])
+    return 0
+
+  def both_strands_count(self, kmer: str) -> int:
+    '''
+    Occurrences of a k-mer plus occurrences of its reverse complement. A reverse-palindromic
+    k-mer is its own reverse complement, so its occurrences count twice.
+    '''
+    kmer_codes = sequence_kmer_codes(kmer, self.k)
+    if len(kmer) != self.k or len(kmer_codes) == 0:
+      return 0
+    code = int(kmer_codes[0])
+    reverse_code = reverse_complement_codes(code, self.k)
+    if not self.canonical:
+      return self.count(kmer) + self.count(number_to_pattern(reverse_code, self.k))
+    return self.count(kmer) * (2 if code == reverse_code else 1)
+
+  def most_frequent(self) -> list:
+    '''
+    Every k-mer sharing the highest count, in lexicographic order.
+    '''
+    codes, counts = self.nonzero()
+    if len(counts) == 0:
+      return []
+    return [number_to_pattern(code, self.k) for code in codes[counts == counts.max()].tolist()]
+
+  def top(self, n: int) -> list:
+    '''
+    The n most frequent k-mers, ties broken lexicographically.
+
+    Args:
+      n (int): number of k-mers to return
+
+    Returns:
+      top_kmers (list): (k-mer, count) pairs by decreasing count
+    '''
+    if n <= 0:
+      return []
+    codes, counts = self.nonzero()
+    if n < len(counts):
+      # only the candidates at or above the n-th largest count need sorting
+      threshold = np.partition(counts, len(counts) - n)[len(counts) - n]
+      keep = counts >= threshold
+      codes, counts = codes[keep], counts[keep]
+    order = np.lexsort((codes, -counts))[:n]
+    return [(number_to_pattern(code, self.k), count) for code, count in zip(codes[order].tolist(), counts[order].tolist())]
+
+  def to_dict(self) -> dict:
+    '''
+    The counts as a FrequencyTable-style dict of k-mer strings.
+    '''
+    codes, counts = self.nonzero()
+    return {number_to_pattern(code, self.k): count for code, count in zip(codes.tolist(), counts.tolist())}
+
+
+def count_kmers(sequence, k: int, canonical: bool = False) -> KmerCounts:
+  '''
+  Counts every k-mer of a sequence, including the last window.
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence
+    k (int): length of the k-mer, at most 32
+    canonical (bool): count strand-agnostically, each k-mer under min(code, reverse complement code)
+
+  Returns:
+    counts (KmerCounts): exact counts of all k-mers
+  '''
+  return KmerCounts.from_codes(sequence_kmer_codes(sequence, int(k)), int(k), canonical=canonical)
+
+
+def count_kmers_in_file(path: str, k: int, chunk_size: int = CHUNK_SIZE, canonical: bool = False) -> KmerCounts:
+  '''
+  Counts every k-mer of a genome file chunk by chunk through the streaming reader. The file
+  size bounds the number of windows, so the layout is chosen as from_codes would for the
+  whole genome.
+  '''
+  k = int(k)
+  dense = k <= DENSE_MAX_K and 4 ** k <= DENSE_MAX_TABLE_PER_WINDOW * max(os.path.getsize(path), 1)
+  total = KmerCounts.from_codes(np.zeros(0, dtype=np.uint64), k, dense=dense, canonical=canonical)
+  for _, chunk in iter_genome_chunks(path, chunk_size, k - 1):
+    total = total.merge(count_kmers(chunk, k, canonical))
+  return total
@@ -0,0 +1,193 @@
+# Persistent k-mer -> sorted positions index of one genome, stored CSR-style: the start
+# positions of all windows sorted by k-mer code, plus offsets telling where each k-mer's run
+# begins. Saved as .npy files and memory-mapped on load, so "where does this k-mer occur"
+# becomes two array lookups instead of a genome rescan.
+import json
+import os
+
+import numpy as np
+
+from fm_index import file_digest
+from genome_reader import read_genome
+from kmer_clumps import min_clump_spans
+from kmer_codec import number_to_pattern, window_codes
+from packed_dna import PackedDNA
+
+# offsets are kept for every possible code up to k = 12 (4^12 + 1 int64 = 128 MB),
+# above that only for the codes that occur
+DENSE_MAX_K = 12
+
+
+class KmerPositionIndex:
+  '''
+  Positions of every k-mer of a genome.
+
+  Attributes:
+    k (int): length of the indexed k-mers
+    positions (np.ndarray): window start positions grouped by k-mer code, ascending within a group
+    offsets (np.ndarray): the positions of k-mer number i are positions[offsets[i]:offsets[i + 1]]
+    codes (np.ndarray): sorted distinct codes numbering the groups, or None when offsets is
+      indexed directly by code (k <= DENSE_MAX_K)
+  '''
+
+  def __init__(self, k: int, positions: np.ndarray, offsets: np.ndarray, codes: np.ndarray = None):
+    self.k = k
+    self.positions = positions
+    self.offsets = offsets
+    self.codes = codes
+
+  @classmethod
+  def build(cls, genome, k: int):
+    '''
+    Indexes every length-k window of a genome (windows with non-ACGT bases are left out).
+
+    Args:
+      genome (str, bytes or PackedDNA): the genome
+      k (int): length of the k-mer, at most 32
+
+    Returns:
+      index (KmerPositionIndex): the index
+    '''
+    k = int(k)
+    if isinstance(genome, PackedDNA):
+      kmer_codes = genome.kmer_codes(k)
+      starts = np.arange(len(kmer_codes))
+    else:
+      kmer_codes, starts = window_codes(genome.strip() if isinstance(genome, str) else genome, k)
+
+    order = np.argsort(kmer_codes, kind="stable")
+    positions = starts[order].astype(np.int64)
+    sorted_codes = kmer_codes[order]
+
+    if k <= DENSE_MAX_K:
+      counts = np.bincount(kmer_codes.astype(np.int64), minlength=4 ** k)
+      return cls(k, positions, np.concatenate(([0], np.cumsum(counts))))
+
+    group_starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+    if len(sorted_codes) == 0:
+      group_starts = group_starts[:0]
+    offsets = np.append(group_starts, len(positions)).astype(np.int64)
+    return cls(k, positions, offsets, sorted_codes[group_starts])
+
+  def save(self, directory: str):
+    '''
+    Writes the index arrays as .npy files into directory.
+    '''
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "positions.npy"), self.positions)
+    np.save(os.path.join(directory, "offsets.npy"), self.offsets)
+    if self.codes is not None:
+      np.save(os.path.join(directory, "codes.npy"), self.codes)
+
+  @classmethod
+  def load(cls, directory: str, k: int):
+    '''
+    Memory-maps an index written by save.
+    '''
+    def load_array(name):
+      return np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+
+    codes = load_array("codes") if int(k) > DENSE_MAX_K else None
+    return cls(int(k), load_array("positions"), load_array("offsets"), codes)
+
+  def group(self, code: int) -> int:
+    '''
+    Row of offsets holding a k-mer code, or -1 when the k-mer does not occur.
+    '''
+    if self.codes is None:
+      return code
+    row = int(np.searchsorted(self.codes, np.uint64(code)))
+    if row < len(self.codes) and int(self.codes[row]) == code:
+      return row
+    return -1
+
+  def kmer_positions(self, kmer: str) -> np.ndarray:
+    '''
+    Sorted start positions of one k-mer.
+    '''
+    codes, _ = window_codes(kmer.strip().upper(), self.k)
+    row = self.group(int(codes[0])) if len(kmer.strip()) == self.k and len(codes) else -1
+    if row < 0:
+      return np.zeros(0, dtype=np.int64)
+    return np.asarray(self.positions[self.offsets[row]:self.offsets[row + 1]])
+
+  def find_pattern(self, pattern: str) -> np.ndarray:
+    '''
+    Start positions of a pattern at least k long: the positions of its first k-mer that are
+    confirmed by the positions of the k-mers tiling the rest of the pattern.
+
+    Args:
+      pattern (str): the pattern, len(pattern) >= k
+
+    Returns:
+      positions (np.ndarray): sorted start positions of pattern
+    '''
+    pattern = pattern.strip().upper()
+    if len(pattern) < self.k:
+      raise ValueError(f"Pattern {pattern!r} is shorter than the indexed k ({self.k})")
+
+    candidates = self.kmer_positions(pattern[:self.k])
+    shifts = list(range(self.k, len(pattern) - self.k + 1, self.k))
+    if len(pattern) > self.k:
+      shifts.append(len(pattern) - self.k)
+
+    for shift in shifts:
+      if len(candidates) == 0:
+        break
+      following = self.kmer_positions(pattern[shift:shift + self.k])
+      candidates = candidates[np.isin(candidates + shift, following, assume_unique=True)]
+    return candidates
+
+  def count_pattern(self, pattern: str) -> int:
+    return len(self.find_pattern(pattern))
+
+  def clumps(self, L: int, t: int) -> set:
+    '''
+    k-mers forming (L, t)-clumps: some t consecutive occurrences lie within L - k bases of
+    each other, read straight off the sorted position runs.
+
+    Args:
+      L (int): length of the window
+      t (int): minimum number of occurrences inside one window
+
+    Returns:
+      clumps (set): k-mers (as strings) forming clumps
+    '''
+    group_sizes = np.diff(self.offsets)
+    group_codes = np.arange(len(group_sizes), dtype=np.uint64) if self.codes is None else self.codes
+    sorted_codes = np.repeat(group_codes, group_sizes)
+
+    codes, spans = min_clump_spans(sorted_codes, np.asarray(self.positions), int(t))
+    return {number_to_pattern(code, self.k) for code in codes[spans <= int(L) - self.k].tolist()}
+
+
+def load_or_build_kmer_index(genome_path: str, k: int, index_dir: str = None) -> KmerPositionIndex:
+  '''
+  Returns the k-mer position index of a genome file, building and saving it the first time.
+  The saved index is rebuilt whenever the genome file content changes.
+
+  Args:
+    genome_path (str): genome file, either FASTA or raw sequence
+    k (int): length of the k-mer
+    index_dir (str): where to keep the index, defaults to <genome_path>.k<k>.kpi
+
+  Returns:
+    index (KmerPositionIndex): memory-mapped index of the genome
+  '''
+  k = int(k)
+  if index_dir is None:
+    index_dir = f"{genome_path}.k{k}.kpi"
+  meta_path = os.path.join(index_dir, "meta.json")
+  digest = file_digest(genome_path)
+
+  if os.path.exists(meta_path):
+    with open(meta_path, "r") as file:
+      meta = json.load(file)
+    if meta.get("sha1") == digest and meta.get("k") == k:
+      return KmerPositionIndex.load(index_dir, k)
+
+  genome = read_genome(genome_path)
+  KmerPositionIndex.build(genome, k).save(index_dir)
+  with open(meta_path, "w") as file:
+    json.dump({"sha1": digest, "k": k, "length": len(genome)}, file)
+  return KmerPositionIndex.load(index_dir, k)
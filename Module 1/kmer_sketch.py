@@ -0,0 +1,195 @@
+# Approximate frequent k-mers in bounded memory, for large k or inputs whose exact k-mer table
+# does not fit: a count-min sketch with conservative update gives upper bounds for any k-mer,
+# and a space-saving (Misra-Gries) heavy-hitter summary keeps the candidates with lower bounds.
+import numpy as np
+
+from genome_reader import CHUNK_SIZE, iter_genome_chunks
+from kmer_codec import number_to_pattern, window_codes
+from reverse_complement import canonical_codes
+
+
+class CountMinSketch:
+  '''
+  depth x width counter table; every k-mer code is hashed to one counter per row with
+  multiply-shift hashing, and its estimate is the smallest of those counters. Estimates never
+  undercount, and overcount by at most e * total / width with probability 1 - e^-depth.
+
+  Attributes:
+    table (np.ndarray): int64 counters, shape (depth, width)
+    total (int): number of k-mers added
+  '''
+
+  def __init__(self, width_bits: int = 20, depth: int = 4, seed: int = 0):
+    generator = np.random.default_rng(seed)
+    self.shift = np.uint64(64 - width_bits)
+    self.multipliers = generator.integers(0, 2 ** 63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    self.increments = generator.integers(0, 2 ** 63, depth, dtype=np.uint64)
+    self.table = np.zeros((depth, 1 << width_bits), dtype=np.int64)
+    self.total = 0
+
+  def columns(self, codes: np.ndarray) -> np.ndarray:
+    return ((self.multipliers[:, None] * codes[None, :] + self.increments[:, None]) >> self.shift).astype(np.int64)
+
+  def estimate(self, codes: np.ndarray) -> np.ndarray:
+    columns = self.columns(codes)
+    return self.table[np.arange(len(self.table))[:, None], columns].min(axis=0)
+
+  def update(self, codes: np.ndarray, counts: np.ndarray):
+    '''
+    Conservative update with distinct codes and their counts: each counter is only raised to
+    the k-mer's new estimate (old minimum + count) instead of being incremented blindly, which
+    keeps estimates tighter while preserving the no-undercount guarantee.
+    '''
+    columns = self.columns(codes)
+    rows = np.arange(len(self.table))[:, None]
+    raised = self.table[rows, columns].min(axis=0) + counts
+    for row in range(len(self.table)):
+      np.maximum.at(self.table[row], columns[row], raised)
+    self.total += int(counts.sum())
+
+
+class HeavyHitters:
+  '''
+  Space-saving summary in its Misra-Gries form, merged batch by batch: at most capacity
+  k-mers are tracked, and when a batch overflows the summary every counter is lowered by the
+  (capacity + 1)-th largest count. A tracked count undercounts by at most `decrement`, and
+  any k-mer occurring more than total / (capacity + 1) times is guaranteed to be tracked.
+
+  Attributes:
+    codes (np.ndarray): tracked k-mer codes, sorted
+    counts (np.ndarray): lower bound of each tracked k-mer's count
+    decrement (int): total amount subtracted from every counter so far
+  '''
+
+  def __init__(self, capacity: int = 10000):
+    self.capacity = capacity
+    self.codes = np.zeros(0, dtype=np.uint64)
+    self.counts = np.zeros(0, dtype=np.int64)
+    self.decrement = 0
+
+  def update(self, codes: np.ndarray, counts: np.ndarray):
+    codes = np.concatenate((self.codes, codes))
+    counts = np.concatenate((self.counts, counts))
+    order = np.argsort(codes, kind="stable")
+    codes, counts = codes[order], counts[order]
+    if len(codes) == 0:
+      return
+
+    starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+    codes, counts = codes[starts], np.add.reduceat(counts, starts)
+
+    if len(codes) > self.capacity:
+      threshold = int(np.partition(counts, len(counts) - self.capacity - 1)[len(counts) - self.capacity - 1])
+      counts = counts - threshold
+      keep = counts > 0
+      codes, counts = codes[keep], counts[keep]
+      self.decrement += threshold
+
+    self.codes, self.counts = codes, counts
+
+
+class FrequentKmerSketch:
+  '''
+  Streaming frequent k-mer finder combining a CountMinSketch and a HeavyHitters summary.
+  Memory is fixed by width_bits, depth and capacity, whatever the input size.
+  '''
+
+  def __init__(self, k: int, width_bits: int = 20, depth: int = 4, capacity: int = 10000,
+               canonical: bool = False, seed: int = 0):
+    self.k = int(k)
+    self.canonical = canonical
+    self.sketch = CountMinSketch(width_bits, depth, seed)
+    self.heavy_hitters = HeavyHitters(capacity)
+
+  def chunk_codes(self, chunk) -> np.ndarray:
+    codes, _ = window_codes(chunk, self.k)
+    return canonical_codes(codes, self.k) if self.canonical else codes
+
+  def update(self, chunk):
+    '''
+    Adds every k-mer of one chunk of sequence (str or bytes).
+    '''
+    codes, counts = np.unique(self.chunk_codes(chunk), return_counts=True)
+    self.sketch.update(codes, counts)
+    self.heavy_hitters.update(codes, counts)
+
+  def top(self, n: int) -> list:
+    '''
+    The n candidates with the highest estimated counts.
+
+    Args:
+      n (int): number of k-mers to return
+
+    Returns:
+      top_kmers (list): (k-mer, lower bound, upper bound) triples by decreasing upper bound;
+        the true count always lies between the bounds
+    '''
+    codes = self.heavy_hitters.codes
+    lower = self.heavy_hitters.counts
+    upper = np.minimum(self.sketch.estimate(codes), lower + self.heavy_hitters.decrement)
+
+    order = np.lexsort((codes, -lower, -upper))[:n]
+    return [(number_to_pattern(code, self.k), low, high)
+            for code, low, high in zip(codes[order].tolist(), lower[order].tolist(), upper[order].tolist())]
+
+  def verify(self, chunks, n: int) -> list:
+    '''
+    Exact recount of every candidate that could still belong to the top n, i.e. whose upper
+    bound reaches the n-th largest lower bound, over a second pass of the same input.
+
+    Args:
+      chunks (iterable): the input again, as chunks overlapping by k - 1 bases
+      n (int): number of top k-mers the candidates are selected for
+
+    Returns:
+      counts (list): (k-mer, count) pairs of the recounted candidates by decreasing count
+    '''
+    top_kmers = self.top(len(self.heavy_hitters.codes))
+    if not top_kmers:
+      return []
+    nth_lower = sorted((low for _, low, _ in top_kmers), reverse=True)[min(n, len(top_kmers)) - 1]
+    kmers = [kmer for kmer, _, high in top_kmers if high >= nth_lower]
+
+    candidates = np.unique(np.concatenate([self.chunk_codes(kmer) for kmer in kmers]))
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    for chunk in chunks:
+      codes = self.chunk_codes(chunk)
+      codes = codes[np.isin(codes, candidates)]
+      counts += np.bincount(np.searchsorted(candidates, codes), minlength=len(candidates))
+
+    order = np.lexsort((candidates, -counts))
+    return [(number_to_pattern(code, self.k), count) for code, count in zip(candidates[order].tolist(), counts[order].tolist())]
+
+
+def approximate_frequent_kmers(path: str, k: int, n: int = 10, verify: bool = False, canonical: bool = False,
+                               width_bits: int = 20, depth: int = 4, capacity: int = 10000,
+                               chunk_size: int = CHUNK_SIZE) -> list:
+  '''
+  Finds the most frequent k-mers of a genome file in bounded memory with one streaming pass,
+  plus an optional second pass that recounts the candidates exactly.
+
+  Args:
+    path (str): genome file, either FASTA or raw sequence
+    k (int): length of the k-mer, at most 32
+    n (int): number of k-mers to report
+    verify (bool): recount the candidates exactly
+    canonical (bool): count strand-agnostically
+    width_bits (int): log2 of the sketch width
+    depth (int): number of sketch rows
+    capacity (int): number of heavy-hitter candidates kept
+    chunk_size (int): number of bases processed at a time
+
+  Returns:
+    top_kmers (list): (k-mer, lower bound, upper bound) triples by decreasing estimate; with
+      verify both bounds are the exact count
+  '''
+  def chunks():
+    return (chunk for _, chunk in iter_genome_chunks(path, chunk_size, int(k) - 1))
+
+  sketch = FrequentKmerSketch(k, width_bits, depth, capacity, canonical)
+  for chunk in chunks():
+    sketch.update(chunk)
+
+  if not verify:
+    return sketch.top(n)
+  return [(kmer, count, count) for kmer, count in sketch.verify(chunks(), n)[:n]]
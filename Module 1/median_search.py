@@ -0,0 +1,157 @@
+# Median string by branch and bound over the 4-ary k-mer prefix tree. The windows of every
+# sequence are laid out once as rows of base codes; going one base deeper adds a single
+# column comparison to each window's running mismatch count, and the sum over sequences of
+# the smallest running count is a lower bound for every k-mer below that prefix, so whole
+# subtrees are cut as soon as it passes the best distance found.
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from kmer_codec import number_to_pattern, sequence_codes
+
+CHILD_BASES = np.arange(4, dtype=np.uint8)[:, None]
+# prefix-tree nodes visited between two exchanges of the best distance / deadline checks
+SYNC_INTERVAL = 1024
+
+
+class DnaWindows:
+  '''
+  Every length-k window of a collection of sequences, as one matrix of base codes.
+
+  Attributes:
+    k (int): window length
+    columns (np.ndarray): uint8, shape (k, total windows), columns[j] holds base j of every window
+    starts (np.ndarray): index of the first window of each sequence, for np.minimum.reduceat
+  '''
+
+  def __init__(self, dna: list, k: int):
+    self.k = int(k)
+    windows = []
+    for sequence in dna:
+      codes = sequence_codes(sequence.strip())
+      if len(codes) < self.k:
+        raise ValueError(f"Every sequence must be at least k = {self.k} bases long")
+      windows.append(sliding_window_view(codes, self.k))
+    self.columns = np.ascontiguousarray(np.concatenate(windows).T)
+    self.starts = np.cumsum([0] + [len(rows) for rows in windows[:-1]])
+
+  @classmethod
+  def from_arrays(cls, columns: np.ndarray, starts: np.ndarray) -> "DnaWindows":
+    '''
+    Wraps existing columns and starts arrays (e.g. views of shared memory) without copying.
+    '''
+    windows = cls.__new__(cls)
+    windows.k = columns.shape[0]
+    windows.columns = columns
+    windows.starts = np.asarray(starts)
+    return windows
+
+  def bounds(self, mismatches: np.ndarray) -> np.ndarray:
+    '''
+    Sum over sequences of the smallest running mismatch count, for each row of mismatches.
+    '''
+    return np.minimum.reduceat(mismatches, self.starts, axis=-1).sum(axis=-1)
+
+
+class MedianSearch:
+  '''
+  Depth-first walk of the k-mer prefix tree in lexicographic order that skips every prefix
+  whose lower bound already exceeds the best distance. Ties go to the lexicographically first
+  k-mer, as in the exhaustive search, so the best (distance, code) pair only ever decreases.
+
+  Attributes:
+    windows (DnaWindows): windows of the DNA set
+    best_distance (int): smallest d(Pattern, Dna) found so far
+    best_code (int): code of the k-mer reaching it, None before the first one
+    exchange (callable): called every SYNC_INTERVAL nodes with (best_distance, best_code),
+      returns a possibly better pair found elsewhere (e.g. by other processes)
+    deadline (float): time.monotonic() value after which the search stops early
+  '''
+
+  def __init__(self, windows: DnaWindows, best_distance: int = None, best_code: int = None,
+               exchange=None, deadline: float = None):
+    self.windows = windows
+    self.k = windows.k
+    if best_distance is None:
+      best_distance, best_code = self.k * len(windows.starts) + 1, None
+    self.best_distance = best_distance
+    self.best_code = best_code
+    self.exchange = exchange
+    self.deadline = deadline
+
+  def pruned(self, code: int, depth: int, bound: int) -> bool:
+    # a subtree only holds k-mers from code << 2(k - depth) on, so at an equal bound it can
+    # only win the tie when it starts before the best k-mer so far
+    return bound > self.best_distance or \
+      (bound == self.best_distance and (code << (2 * (self.k - depth))) > self.best_code)
+
+  def sync(self):
+    if self.exchange is not None:
+      self.best_distance, self.best_code = self.exchange(self.best_distance, self.best_code)
+
+  def search(self, prefix: int = 0, depth: int = 0) -> bool:
+    '''
+    Searches the subtree of one prefix, updating best_distance and best_code.
+
+    Args:
+      prefix (int): code of the prefix, the whole tree by default
+      depth (int): length of the prefix
+
+    Returns:
+      complete (bool): False when the deadline stopped the search before the subtree was done
+    '''
+    k, columns = self.k, self.windows.columns
+    mismatches = np.zeros(columns.shape[1], dtype=np.int32)
+    for j in range(depth):
+      mismatches += columns[j] != (prefix >> (2 * (depth - 1 - j))) & 3
+
+    stack = [(prefix, depth, mismatches, 0)]
+    nodes = 0
+    while stack:
+      prefix, depth, mismatches, bound = stack.pop()
+      nodes += 1
+      if nodes % SYNC_INTERVAL == 0:
+        self.sync()
+        if self.deadline is not None and time.monotonic() > self.deadline:
+          return False
+      # the best distance may have improved since this prefix was pushed
+      if depth and self.pruned(prefix, depth, bound):
+        continue
+      children = mismatches[None, :] + (columns[depth][None, :] != CHILD_BASES)
+      bounds = self.windows.bounds(children).tolist()
+
+      # children are pushed last base first so the A child is explored first
+      for base in (3, 2, 1, 0):
+        code = (prefix << 2) | base
+        if self.pruned(code, depth + 1, bounds[base]):
+          continue
+        if depth + 1 == k:
+          self.best_distance, self.best_code = bounds[base], code
+        else:
+          stack.append((code, depth + 1, children[base], bounds[base]))
+
+    self.sync()
+    return True
+
+  def median(self) -> tuple:
+    if self.best_code is None:
+      return None, self.best_distance
+    return number_to_pattern(self.best_code, self.k), self.best_distance
+
+
+def branch_and_bound_median(dna: list, k: int) -> tuple:
+  '''
+  Finds the median string, the k-mer minimizing d(Pattern, Dna), with a MedianSearch over the
+  whole prefix tree.
+
+  Args:
+    dna (list): the sequences
+    k (int): length of the median string
+
+  Returns:
+    (median, distance) (tuple): the lexicographically first median string and d(median, Dna)
+  '''
+  search = MedianSearch(DnaWindows(dna, k))
+  search.search()
+  return search.median()
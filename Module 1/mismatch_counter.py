@@ -0,0 +1,168 @@
+# Frequent words with mismatches over integer k-mer codes: every k-mer is credited with the
+# number of windows within Hamming distance d of it. Each distinct window is expanded only
+# once (weighted by how often it occurs), through the XOR substitution masks of the neighborhood
+# module; counts go into a dense 4^k array for small k and through sort-and-reduce above that.
+# frequent_words_by_sorting is the leanest variant: one uint64 per (neighbor) occurrence,
+# sorted and run-length encoded, usable up to k = 32.
+from multiprocessing import Pool
+
+import numpy as np
+
+from kmer_codec import decode_kmers
+from kmer_counter import DENSE_MAX_TABLE_PER_WINDOW, KmerCounts, run_lengths, sequence_kmer_codes
+from neighborhood import neighborhoods, substitution_masks
+from parallel_kmer_counter import split_range
+from reverse_complement import reverse_complement_codes
+
+# 4^13 int64 counters take 512 MB, larger k switches to sort-and-reduce
+DENSE_MAX_K = 13
+# neighbor codes materialized at a time by the sort-and-reduce path
+SORT_BATCH = 1 << 22
+
+
+def count_codes_with_mismatches(kmer_codes: np.ndarray, k: int, d: int, dense: bool = None) -> KmerCounts:
+  '''
+  For every k-mer, the number of the given window codes within Hamming distance d of it.
+
+  Args:
+    kmer_codes (np.ndarray): uint64 codes of the windows
+    k (int): length of the k-mers, at most 32
+    d (int): maximum number of mismatches
+    dense (bool): force the dense or sparse layout, by default dense when k <= DENSE_MAX_K
+      and the 4^k table is not much larger than the number of neighbors generated
+
+  Returns:
+    counts (KmerCounts): approximate-occurrence counts of every k-mer in some window's neighborhood
+  '''
+  codes, counts = np.unique(np.asarray(kmer_codes, dtype=np.uint64), return_counts=True)
+  masks = substitution_masks(k, d)
+  if dense is None:
+    dense = k <= DENSE_MAX_K and 4 ** k <= DENSE_MAX_TABLE_PER_WINDOW * max(len(codes) * len(masks), 1)
+
+  if dense:
+    table = np.zeros(4 ** k, dtype=np.int64)
+    # XOR with a fixed mask is a bijection, so the distinct codes never collide within one
+    # mask and plain fancy-index addition is exact
+    for mask in masks:
+      table[(codes ^ mask).astype(np.int64)] += counts
+    return KmerCounts(k, dense=table)
+
+  total = KmerCounts(k, codes=np.zeros(0, dtype=np.uint64), counts=np.zeros(0, dtype=np.int64))
+  batch = max(SORT_BATCH // max(len(codes), 1), 1)
+  for first in range(0, len(masks), batch):
+    batch_masks = masks[first:first + batch]
+    neighbors = (codes[:, None] ^ batch_masks[None, :]).ravel()
+    weights = np.repeat(counts, len(batch_masks))
+    order = np.argsort(neighbors)
+    neighbors, weights = neighbors[order], weights[order]
+    if len(neighbors):
+      starts = np.flatnonzero(np.concatenate(([True], neighbors[1:] != neighbors[:-1])))
+      total.merge(KmerCounts(k, codes=neighbors[starts], counts=np.add.reduceat(weights, starts)))
+  return total
+
+
+def count_shard_with_mismatches(task: tuple) -> KmerCounts:
+  shard, k, d, dense = task
+  return count_codes_with_mismatches(sequence_kmer_codes(shard, k), k, d, dense)
+
+
+def count_with_mismatches(sequence, k: int, d: int, workers: int = None) -> KmerCounts:
+  '''
+  Approximate-occurrence counts of every k-mer of a sequence, optionally split over a pool of
+  worker processes by genome shards overlapping by k - 1 bases.
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence
+    k (int): length of the k-mers, at most 32
+    d (int): maximum number of mismatches
+    workers (int): number of worker processes, None or 1 counts in this process
+
+  Returns:
+    counts (KmerCounts): for each k-mer, the number of windows within distance d of it
+  '''
+  k, d = int(k), int(d)
+  if not workers or workers == 1:
+    return count_codes_with_mismatches(sequence_kmer_codes(sequence, k), k, d)
+
+  if isinstance(sequence, str):
+    sequence = sequence.strip()
+  windows = max(len(sequence) - k + 1, 0)
+  dense = k <= DENSE_MAX_K and 4 ** k <= DENSE_MAX_TABLE_PER_WINDOW * max(windows * len(substitution_masks(k, d)), 1)
+  tasks = [(sequence[start:end + k - 1], k, d, dense) for start, end in split_range(windows, workers)]
+
+  total = None
+  with Pool(workers) as pool:
+    for counts in pool.imap_unordered(count_shard_with_mismatches, tasks):
+      total = counts if total is None else total.merge(counts)
+  return total
+
+
+def lookup_counts(codes: np.ndarray, counts: np.ndarray, queries: np.ndarray) -> np.ndarray:
+  '''
+  Counts of query codes in sorted (codes, counts) arrays, 0 for codes that are absent.
+  '''
+  rows = np.minimum(np.searchsorted(codes, queries), max(len(codes) - 1, 0))
+  found = codes[rows] == queries if len(codes) else np.zeros(len(queries), dtype=bool)
+  return np.where(found, counts[rows] if len(codes) else 0, 0)
+
+
+def frequent_words_with_mismatches(sequence, k: int, d: int, reverse: bool = False, workers: int = None) -> list:
+  '''
+  Most frequent k-mers with up to d mismatches, optionally counting reverse complements too.
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence
+    k (int): length of the k-mers, at most 32
+    d (int): maximum number of mismatches
+    reverse (bool): score each k-mer as count(k-mer) + count(reverse complement)
+    workers (int): number of worker processes for the counting
+
+  Returns:
+    patterns (list): every k-mer sharing the highest count, in lexicographic order
+  '''
+  k = int(k)
+  counts = count_with_mismatches(sequence, k, d, workers)
+  if not reverse:
+    return counts.most_frequent()
+
+  if counts.dense is not None:
+    both = counts.dense + counts.dense[reverse_complement_codes(np.arange(4 ** k, dtype=np.uint64), k).astype(np.int64)]
+    return KmerCounts(k, dense=both).most_frequent()
+
+  observed, observed_counts = counts.nonzero()
+  codes = np.union1d(observed, reverse_complement_codes(observed, k))
+  both = (lookup_counts(observed, observed_counts, codes)
+          + lookup_counts(observed, observed_counts, reverse_complement_codes(codes, k)))
+  return KmerCounts(k, codes=codes, counts=both).most_frequent()
+
+
+def frequent_words_by_sorting(sequence, k: int, d: int = 0, reverse: bool = False) -> tuple:
+  '''
+  Most frequent k-mers (with up to d mismatches) found by sorting: the codes of every window,
+  or of every neighbor of every window, go into one uint64 array that is sorted and
+  run-length encoded. Memory is one machine word per occurrence and no Python object is
+  created per k-mer, so any k up to 32 works.
+
+  Args:
+    sequence (str, bytes or PackedDNA): DNA sequence
+    k (int): length of the k-mers, at most 32
+    d (int): maximum number of mismatches, 0 for exact frequent words
+    reverse (bool): score each k-mer as count(k-mer) + count(reverse complement)
+
+  Returns:
+    (patterns, count) (tuple): every k-mer sharing the highest count in lexicographic order, and that count
+  '''
+  k = int(k)
+  codes = sequence_kmer_codes(sequence, k)
+  if d:
+    codes = neighborhoods(codes, k, int(d)).ravel()
+  if reverse:
+    # count(p) + count(rc(p)) is the number of occurrences of p among the codes and their
+    # reverse complements together
+    codes = np.concatenate((codes, reverse_complement_codes(codes, k)))
+
+  distinct, counts = run_lengths(np.sort(codes))
+  if len(counts) == 0:
+    return [], 0
+  maximum = int(counts.max())
+  return decode_kmers(distinct[counts == maximum], k), maximum
@@ -0,0 +1,131 @@
+# Implanted motif enumeration as an intersection of d-neighborhoods in integer space. The
+# (k, d)-motifs of a DNA set are exactly the k-mers lying in the d-neighborhood of some window
+# of every sequence, so the candidates start as the neighborhood of one sequence and are cut
+# down sequence by sequence, stopping as soon as none are left. While the candidates are many
+# they are a bitmap over all 4^k codes (or a sorted code array when k is too large for one);
+# once fewer remain than one k-mer has neighbors, checking each survivor against the windows
+# directly is cheaper than generating the next neighborhood. Only the motifs are decoded.
+import numpy as np
+
+from hamming import DISTANCE_BLOCK_CELLS, distance_matrix, pattern_block_size, popcount, sequence_windows
+from kmer_codec import decode_kmers
+from neighborhood import neighborhoods, substitution_masks
+
+# largest bitmap over all 4^k codes (bytes), 4^15 bits fit
+BITMAP_MAX_BYTES = 1 << 27
+# neighbor codes generated at once
+NEIGHBOR_BATCH = 1 << 22
+
+
+def neighbor_batches(codes: np.ndarray, k: int, d: int):
+  '''
+  Yields the d-neighborhoods of a set of k-mer codes as flat uint64 arrays of about
+  NEIGHBOR_BATCH codes (with repeats where neighborhoods overlap).
+  '''
+  windows = max(NEIGHBOR_BATCH // len(substitution_masks(k, d)), 1)
+  for start in range(0, len(codes), windows):
+    yield neighborhoods(codes[start:start + windows], k, d).ravel()
+
+
+def neighborhood_bitmap(codes: np.ndarray, k: int, d: int) -> np.ndarray:
+  '''
+  Bitmap of the union of the d-neighborhoods of a set of k-mer codes: bit (code % 64) of
+  word (code // 64) is set for every k-mer within distance d of one of them.
+  '''
+  bitmap = np.zeros(-(-4 ** k // 64), dtype=np.uint64)
+  for neighbors in neighbor_batches(codes, k, d):
+    np.bitwise_or.at(bitmap, (neighbors >> np.uint64(6)).astype(np.intp),
+                     np.left_shift(np.uint64(1), neighbors & np.uint64(63)))
+  return bitmap
+
+
+def bitmap_codes(bitmap: np.ndarray) -> np.ndarray:
+  '''
+  Sorted codes of the set bits of a neighborhood_bitmap.
+  '''
+  words = np.flatnonzero(bitmap)
+  bits = np.unpackbits(bitmap[words].astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+  return (words[:, None].astype(np.uint64) * np.uint64(64) + np.arange(64, dtype=np.uint64))[bits.astype(bool)]
+
+
+def neighborhood_set(codes: np.ndarray, k: int, d: int) -> np.ndarray:
+  '''
+  Sorted distinct codes of the union of the d-neighborhoods of a set of k-mer codes.
+  '''
+  return np.unique(np.concatenate([np.unique(neighbors) for neighbors in neighbor_batches(codes, k, d)]))
+
+
+def in_neighborhood(candidates: np.ndarray, codes: np.ndarray, k: int, d: int) -> np.ndarray:
+  '''
+  Which of a sorted candidate array lie in the d-neighborhood of a set of k-mer codes, found by
+  looking every generated neighbor up in the candidates.
+  '''
+  found = np.zeros(len(candidates), dtype=bool)
+  for neighbors in neighbor_batches(codes, k, d):
+    neighbors = np.sort(neighbors)
+    slots = np.minimum(np.searchsorted(candidates, neighbors), len(candidates) - 1)
+    found[slots[candidates[slots] == neighbors]] = True
+  return found
+
+
+def within_distance(candidates: np.ndarray, codes: np.ndarray, k: int, d: int) -> np.ndarray:
+  '''
+  Which candidates are within Hamming distance d of at least one of a set of k-mer codes,
+  checked directly in blocks of DISTANCE_BLOCK_CELLS distances.
+  '''
+  found = np.zeros(len(candidates), dtype=bool)
+  block = pattern_block_size([codes], DISTANCE_BLOCK_CELLS)
+  for start in range(0, len(candidates), block):
+    found[start:start + block] = distance_matrix(candidates[start:start + block], codes).min(axis=1) <= d
+  return found
+
+
+def motif_codes(dna: list, k: int, d: int) -> np.ndarray:
+  '''
+  Codes of every (k, d)-motif of a DNA set: the k-mers appearing in every sequence with at
+  most d mismatches.
+
+  Args:
+    dna (list): the sequences (windows with non-ACGT bases are ignored)
+    k (int): length of the motifs
+    d (int): maximum number of mismatches
+
+  Returns:
+    codes (np.ndarray): sorted uint64 codes of the motifs
+  '''
+  k, d = int(k), int(d)
+  # sequences with fewer distinct windows have smaller neighborhoods, start with them
+  windows = sorted(sequence_windows(dna, k), key=len)
+  if not windows or not len(windows[0]):
+    return np.zeros(0, dtype=np.uint64)
+  neighbors = len(substitution_masks(k, d))
+
+  bitmap, candidates = None, None
+  for codes in windows:
+    if bitmap is not None and int(popcount(bitmap).sum()) <= neighbors:
+      bitmap, candidates = None, bitmap_codes(bitmap)
+
+    if candidates is not None:
+      if len(candidates) <= neighbors:
+        candidates = candidates[within_distance(candidates, codes, k, d)]
+      else:
+        candidates = candidates[in_neighborhood(candidates, codes, k, d)]
+      if not len(candidates):
+        break
+    elif bitmap is not None:
+      bitmap &= neighborhood_bitmap(codes, k, d)
+      if not bitmap.any():
+        return np.zeros(0, dtype=np.uint64)
+    elif 4 ** k <= 8 * BITMAP_MAX_BYTES:
+      bitmap = neighborhood_bitmap(codes, k, d)
+    else:
+      candidates = neighborhood_set(codes, k, d)
+
+  return bitmap_codes(bitmap) if bitmap is not None else candidates
+
+
+def enumerate_motifs(dna: list, k: int, d: int) -> list:
+  '''
+  Every (k, d)-motif of a DNA set as strings, in lexicographic order.
+  '''
+  return decode_kmers(motif_codes(dna, k, d), int(k))
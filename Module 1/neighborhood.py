@@ -0,0 +1,107 @@
+# d-neighborhoods (every k-mer within Hamming distance d) in integer space. A neighbor with
+# mismatches at a chosen set of positions is the k-mer code XOR-ed with a non-zero 2-bit digit
+# at each of those positions, and each of the three digits gives a different base, so walking
+# position combinations x substitution digits produces every neighbor exactly once, with no
+# duplicates to filter and no strings built.
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import combinations, product
+
+import numpy as np
+
+from kmer_codec import decode_kmers, pattern_to_number
+
+# bytes of neighbor codes memoized by neighborhood_codes, over all k and d
+NEIGHBORHOOD_CACHE_BYTES = 1 << 26
+
+
+@lru_cache(maxsize=None)
+def substitution_masks(k: int, d: int) -> np.ndarray:
+  '''
+  XOR masks turning a k-mer code into each of its neighbors with at most d mismatches, the
+  zero mask (the k-mer itself) first. There are sum(C(k, m) * 3^m for m <= d) of them.
+  '''
+  masks = [0]
+  for mismatches in range(1, min(d, k) + 1):
+    for positions in combinations(range(k), mismatches):
+      shifts = [2 * (k - 1 - position) for position in positions]
+      for digits in product((1, 2, 3), repeat=mismatches):
+        mask = 0
+        for shift, digit in zip(shifts, digits):
+          mask |= digit << shift
+        masks.append(mask)
+  masks = np.array(masks, dtype=np.uint64)
+  masks.flags.writeable = False
+  return masks
+
+
+class NeighborhoodCache:
+  '''
+  Least-recently-used cache of neighborhoods keyed by (code, k, d), bounded by the total size
+  of the arrays it holds rather than by their number.
+
+  Attributes:
+    max_bytes (int): largest total size of the cached arrays
+    nbytes (int): current total size of the cached arrays
+    entries (OrderedDict): cached read-only arrays, least recently used first
+  '''
+
+  def __init__(self, max_bytes: int):
+    self.max_bytes = max_bytes
+    self.nbytes = 0
+    self.entries = OrderedDict()
+
+  def get(self, code: int, k: int, d: int) -> np.ndarray:
+    key = (code, k, d)
+    codes = self.entries.get(key)
+    if codes is not None:
+      self.entries.move_to_end(key)
+      return codes
+
+    codes = np.uint64(code) ^ substitution_masks(k, d)
+    codes.flags.writeable = False
+    if codes.nbytes <= self.max_bytes:
+      self.entries[key] = codes
+      self.nbytes += codes.nbytes
+      while self.nbytes > self.max_bytes:
+        _, evicted = self.entries.popitem(last=False)
+        self.nbytes -= evicted.nbytes
+    return codes
+
+
+NEIGHBORHOODS = NeighborhoodCache(NEIGHBORHOOD_CACHE_BYTES)
+
+
+def neighborhood_codes(code: int, k: int, d: int) -> np.ndarray:
+  '''
+  Codes of every k-mer within Hamming distance d of one k-mer code, memoized (up to
+  NEIGHBORHOOD_CACHE_BYTES in total) since the same k-mers recur all over a genome. The
+  returned array is shared by the cache and read-only.
+
+  Args:
+    code (int): the k-mer code
+    k (int): length of the k-mer, at most 32
+    d (int): maximum number of mismatches
+
+  Returns:
+    codes (np.ndarray): uint64 codes of the neighbors, each exactly once, the k-mer itself first
+  '''
+  return NEIGHBORHOODS.get(int(code), int(k), int(d))
+
+
+def neighborhoods(codes: np.ndarray, k: int, d: int) -> np.ndarray:
+  '''
+  d-neighborhoods of many k-mer codes at once.
+
+  Returns:
+    neighbors (np.ndarray): uint64 matrix, row i holds the neighborhood of codes[i]
+  '''
+  return np.asarray(codes, dtype=np.uint64)[:, None] ^ substitution_masks(k, d)[None, :]
+
+
+def neighbor_strings(pattern: str, d: int) -> set:
+  '''
+  Every string within Hamming distance d of a pattern made of A, C, G and T.
+  '''
+  pattern = pattern.strip().upper()
+  return set(decode_kmers(neighborhood_codes(pattern_to_number(pattern), len(pattern), d), len(pattern)))
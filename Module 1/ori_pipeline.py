@@ -0,0 +1,114 @@
+# Batch ori prediction over a directory of genomes, one genome per worker process: skew
+# minimum -> ori window -> most frequent k-mers with mismatches and reverse complements
+# (the DnaA box candidates), the workflow of salmonella_enterica.ipynb. Skew extrema and
+# k-mer indexes are cached per genome content hash, so re-runs only redo the window analysis.
+#
+#   python ori_pipeline.py <genome directory> [k] [d] [window] > ori_table.tsv
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from fm_index import file_digest
+from genome_reader import read_genome, stream_skew
+from kmer_position_index import load_or_build_kmer_index
+from mismatch_counter import frequent_words_with_mismatches
+from reverse_complement import reverse_complement
+
+GENOME_EXTENSIONS = (".fa", ".fasta", ".fna", ".txt")
+TABLE_COLUMNS = ["genome", "sha1", "length", "skew_minimum", "ori", "window_start", "window_end",
+                 "dnaa_candidates", "genome_occurrences"]
+
+
+def genome_files(directory: str) -> list:
+  return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                if name.lower().endswith(GENOME_EXTENSIONS) and os.path.isfile(os.path.join(directory, name)))
+
+
+def skew_extrema(genome_path: str, cache_dir: str) -> dict:
+  '''
+  Skew minimum and maximum of a genome with their positions, read from cache_dir/skew.json
+  when present (cache_dir is specific to the genome content).
+  '''
+  cache_path = os.path.join(cache_dir, "skew.json")
+  if os.path.exists(cache_path):
+    with open(cache_path, "r") as file:
+      return json.load(file)
+
+  tracker = stream_skew(genome_path)
+  extrema = {"length": tracker.length, "minimum": tracker.minimum, "minima": tracker.minima,
+             "maximum": tracker.maximum, "maxima": tracker.maxima}
+  os.makedirs(cache_dir, exist_ok=True)
+  with open(cache_path, "w") as file:
+    json.dump(extrema, file)
+  return extrema
+
+
+def predict_ori(task: tuple) -> dict:
+  '''
+  Runs every stage for one genome.
+
+  Args:
+    task (tuple): (genome_path, k, d, window, cache_root)
+
+  Returns:
+    row (dict): one table row, keyed by TABLE_COLUMNS
+  '''
+  genome_path, k, d, window, cache_root = task
+  digest = file_digest(genome_path)
+  cache_dir = os.path.join(cache_root, digest)
+
+  extrema = skew_extrema(genome_path, cache_dir)
+  # the skew minimum is usually a short plateau, ori is taken at its middle
+  ori = (extrema["minima"][0] + extrema["minima"][-1]) // 2
+  start = max(min(ori - window // 2, extrema["length"] - window), 0)
+  end = min(start + window, extrema["length"])
+
+  genome = read_genome(genome_path)
+  candidates = frequent_words_with_mismatches(genome[start:end], k, d, reverse=True)
+
+  index = load_or_build_kmer_index(genome_path, k, os.path.join(cache_dir, f"k{k}.kpi"))
+  occurrences = [len(index.kmer_positions(kmer)) + len(index.kmer_positions(reverse_complement(kmer)))
+                 for kmer in candidates]
+
+  return {"genome": os.path.basename(genome_path), "sha1": digest, "length": extrema["length"],
+          "skew_minimum": extrema["minimum"], "ori": ori, "window_start": start, "window_end": end,
+          "dnaa_candidates": " ".join(candidates), "genome_occurrences": " ".join(map(str, occurrences))}
+
+
+def run_pipeline(directory: str, k: int = 9, d: int = 1, window: int = 500, workers: int = None,
+                 cache_dir: str = None) -> list:
+  '''
+  Predicts ori and DnaA box candidates for every genome file of a directory.
+
+  Args:
+    directory (str): directory holding the genome files (FASTA or raw sequence)
+    k (int): length of the DnaA box candidates
+    d (int): maximum number of mismatches between occurrences of a candidate
+    window (int): length of the window around the skew minimum that is searched
+    workers (int): number of worker processes, defaults to the number of CPUs
+    cache_dir (str): where per-genome artifacts are cached, defaults to <directory>/.ori_cache
+
+  Returns:
+    rows (list): one dict per genome, in file name order
+  '''
+  if cache_dir is None:
+    cache_dir = os.path.join(directory, ".ori_cache")
+  tasks = [(path, int(k), int(d), int(window), cache_dir) for path in genome_files(directory)]
+  with Pool(workers or os.cpu_count()) as pool:
+    return pool.map(predict_ori, tasks, chunksize=1)
+
+
+def write_table(rows: list, file):
+  '''
+  Writes pipeline rows as a tab-separated table with a header line.
+  '''
+  file.write("\t".join(TABLE_COLUMNS) + "\n")
+  for row in rows:
+    file.write("\t".join(str(row[column]) for column in TABLE_COLUMNS) + "\n")
+
+
+if __name__ == "__main__":
+  defaults = [".", "9", "1", "500"]
+  arguments = sys.argv[1:] + defaults[len(sys.argv) - 1:]
+  write_table(run_pipeline(arguments[0], int(arguments[1]), int(arguments[2]), int(arguments[3])), sys.stdout)
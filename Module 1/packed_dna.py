@@ -0,0 +1,123 @@
+# Compact 2-bit-per-base DNA sequence (A=0, C=1, G=2, T=3, four bases per byte).
+# A PackedDNA behaves like a read-only str for the Module 1 routines (len, indexing,
+# slicing, ==, hashing, strip), but slices are zero-copy views into the same buffer.
+import numpy as np
+
+from kmer_codec import BASE_LETTERS, BASES, rolling_kmer_codes, sequence_codes
+
+
+class PackedDNA:
+  '''
+  Read-only DNA sequence stored with 2 bits per base.
+
+  Attributes:
+    packed (np.ndarray): uint8 buffer, shared between a sequence and all its views
+    offset (int): index of the first base of this view in the buffer
+    length (int): number of bases in this view
+  '''
+
+  def __init__(self, packed: np.ndarray, length: int, offset: int = 0):
+    self.packed = packed
+    self.length = length
+    self.offset = offset
+
+  @classmethod
+  def from_string(cls, sequence):
+    '''
+    Packs a DNA string.
+
+    Args:
+      sequence (str or bytes): DNA sequence, surrounding whitespace is ignored
+
+    Returns:
+      packed_dna (PackedDNA): the packed sequence
+    '''
+    codes = sequence_codes(sequence.strip(), strict=True)
+    return cls.from_codes(codes)
+
+  @classmethod
+  def from_codes(cls, codes: np.ndarray):
+    '''
+    Packs an array of 2-bit base codes.
+    '''
+    length = len(codes)
+    padded = np.zeros((length + 3) // 4 * 4, dtype=np.uint8)
+    padded[:length] = codes
+    quads = padded.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return cls(packed.astype(np.uint8), length)
+
+  @property
+  def nbytes(self) -> int:
+    return self.packed.nbytes
+
+  def codes(self) -> np.ndarray:
+    '''
+    Unpacks this view into one uint8 code per base.
+    '''
+    first_byte = self.offset // 4
+    last_byte = (self.offset + self.length + 3) // 4
+    chunk = self.packed[first_byte:last_byte]
+
+    unpacked = np.empty((len(chunk), 4), dtype=np.uint8)
+    for i in range(4):
+      unpacked[:, i] = (chunk >> (6 - 2 * i)) & 3
+
+    start = self.offset % 4
+    return unpacked.ravel()[start:start + self.length]
+
+  def kmer_codes(self, k: int) -> np.ndarray:
+    '''
+    Integer codes of every length-k window, computed in one vectorized pass over the sequence.
+
+    Args:
+      k (int): window length, at most 32
+
+    Returns:
+      kmer_codes (np.ndarray): uint64 array, entry i is the code of the window starting at i
+    '''
+    return rolling_kmer_codes(self.codes(), k)
+
+  def __len__(self):
+    return self.length
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      start, stop, step = index.indices(self.length)
+      if step != 1:
+        return PackedDNA.from_codes(self.codes()[start:stop:step])
+      return PackedDNA(self.packed, max(stop - start, 0), self.offset + start)
+
+    if index < 0:
+      index += self.length
+    if not 0 <= index < self.length:
+      raise IndexError("PackedDNA index out of range")
+    position = self.offset + index
+    return BASES[(int(self.packed[position // 4]) >> (6 - 2 * (position % 4))) & 3]
+
+  def __iter__(self):
+    return iter(str(self))
+
+  def __str__(self):
+    return BASE_LETTERS[self.codes()].tobytes().decode("ascii")
+
+  def __repr__(self):
+    text = str(self) if self.length <= 40 else str(self[:37]) + "..."
+    return f"PackedDNA('{text}', length={self.length})"
+
+  def __eq__(self, other):
+    if isinstance(other, PackedDNA):
+      return self.length == other.length and np.array_equal(self.codes(), other.codes())
+    if isinstance(other, str):
+      return self.length == len(other) and str(self) == other
+    return NotImplemented
+
+  def __hash__(self):
+    # equal to the hash of the str, so views and strings can share dict keys
+    return hash(str(self))
+
+  def strip(self):
+    return self
+
+  def count(self, base: str) -> int:
+    return int(np.count_nonzero(self.codes() == BASES.index(base)))
@@ -0,0 +1,136 @@
+# Process-parallel k-mer counting. The genome is copied once into shared memory and split
+# into shards that overlap by k - 1 bases; every worker counts its shard into its own row of a
+# shared dense count matrix, and the rows are summed column-block by column-block by the same
+# pool, so no counts are ever pickled.
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from kmer_counter import DENSE_MAX_K, DENSE_MAX_TABLE_PER_WINDOW, KmerCounts, run_lengths
+from kmer_codec import window_codes
+from reverse_complement import canonical_codes
+
+# shared memory allowed for the per-worker uint32 count rows plus the int64 total, above it
+# workers return sorted codes and counts instead
+SHARED_COUNTS_MAX_BYTES = 1 << 30
+
+
+def attach(name: str, shape: tuple, dtype) -> tuple:
+  block = shared_memory.SharedMemory(name=name)
+  return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def count_shard(task: tuple):
+  '''
+  Counts the k-mers starting in genome[start:end] into row `row` of the shared count matrix,
+  or returns them as sorted (codes, counts) arrays when there is no matrix (large k).
+  '''
+  genome_name, genome_length, start, end, k, canonical, counts_name, rows, row = task
+  genome_block, genome = attach(genome_name, (genome_length,), np.uint8)
+  try:
+    codes, _ = window_codes(genome[start:min(end + k - 1, genome_length)], k)
+    if canonical:
+      codes = canonical_codes(codes, k)
+    if counts_name is None:
+      return run_lengths(np.sort(codes))
+
+    counts_block, counts = attach(counts_name, (rows, 4 ** k), np.uint32)
+    try:
+      counts[row] = np.bincount(codes.astype(np.int64), minlength=4 ** k)
+    finally:
+      del counts
+      counts_block.close()
+  finally:
+    del genome
+    genome_block.close()
+
+
+def sum_columns(task: tuple):
+  '''
+  Sums columns [first, last) of the shared count matrix over all workers into the shared total.
+  '''
+  counts_name, total_name, rows, table_size, first, last = task
+  counts_block, counts = attach(counts_name, (rows, table_size), np.uint32)
+  total_block, total = attach(total_name, (table_size,), np.int64)
+  try:
+    total[first:last] = counts[:, first:last].sum(axis=0, dtype=np.int64)
+  finally:
+    del counts, total
+    counts_block.close()
+    total_block.close()
+
+
+def split_range(length: int, parts: int) -> list:
+  bounds = np.linspace(0, length, parts + 1).astype(np.int64).tolist()
+  return list(zip(bounds[:-1], bounds[1:]))
+
+
+def uses_shared_counts(windows: int, k: int, workers: int) -> bool:
+  '''
+  Whether count_kmers_parallel counts into the shared dense matrix (True) or has the workers
+  return sorted codes and counts (False).
+  '''
+  table_size = 4 ** k
+  return k <= DENSE_MAX_K and table_size <= DENSE_MAX_TABLE_PER_WINDOW * max(windows, 1) and \
+    table_size * (4 * workers + 8) <= SHARED_COUNTS_MAX_BYTES
+
+
+def count_kmers_parallel(sequence, k: int, workers: int = None, canonical: bool = False) -> KmerCounts:
+  '''
+  Counts every k-mer of a sequence on a pool of worker processes. The result is identical
+  to kmer_counter.count_kmers.
+
+  Args:
+    sequence (str or bytes): DNA sequence
+    k (int): length of the k-mer, at most 32
+    workers (int): number of worker processes, defaults to the number of CPUs
+    canonical (bool): count strand-agnostically, as in kmer_counter.count_kmers
+
+  Returns:
+    counts (KmerCounts): exact counts of all k-mers
+  '''
+  k = int(k)
+  workers = workers or os.cpu_count()
+  if isinstance(sequence, str):
+    sequence = sequence.strip().encode("ascii")
+
+  windows = max(len(sequence) - k + 1, 0)
+  shards = split_range(windows, workers)
+  table_size = 4 ** k
+  dense = uses_shared_counts(windows, k, workers)
+
+  genome_block = shared_memory.SharedMemory(create=True, size=max(len(sequence), 1))
+  counts_block = total_block = None
+  try:
+    np.ndarray((len(sequence),), dtype=np.uint8, buffer=genome_block.buf)[:] = np.frombuffer(sequence, dtype=np.uint8)
+
+    with Pool(workers) as pool:
+      if not dense:
+        counts = KmerCounts.from_codes(np.zeros(0, dtype=np.uint64), k, dense=False, canonical=canonical)
+        tasks = [(genome_block.name, len(sequence), start, end, k, canonical, None, 0, 0) for start, end in shards]
+        for codes, shard_counts in pool.imap_unordered(count_shard, tasks):
+          counts.merge(KmerCounts(k, codes=codes, counts=shard_counts, canonical=canonical))
+        return counts
+
+      counts_block = shared_memory.SharedMemory(create=True, size=workers * table_size * 4)
+      total_block = shared_memory.SharedMemory(create=True, size=table_size * 8)
+
+      tasks = [(genome_block.name, len(sequence), start, end, k, canonical, counts_block.name, workers, row)
+               for row, (start, end) in enumerate(shards)]
+      pool.map(count_shard, tasks)
+
+      tasks = [(counts_block.name, total_block.name, workers, table_size, first, last)
+               for first, last in split_range(table_size, workers)]
+      pool.map(sum_columns, tasks)
+
+    total = np.ndarray((table_size,), dtype=np.int64, buffer=total_block.buf)
+    counts = KmerCounts(k, dense=total.copy(), canonical=canonical)
+    del total
+    return counts
+
+  finally:
+    for block in (genome_block, counts_block, total_block):
+      if block is not None:
+        block.close()
+        block.unlink()
@@ -0,0 +1,114 @@
+# Process-parallel median string. The windows of the DNA set are copied once into shared memory
+# and the k-mer prefix tree is cut into shards at a fixed prefix length, handed to the pool in
+# lexicographic order. Each worker runs the serial branch and bound on its shard and every
+# SYNC_INTERVAL nodes merges its best (distance, code) with a shared pair, so a good median
+# found in one shard tightens the bounds of all the others. Ties resolve to the smallest code
+# exactly as in the serial search, so the result is the same median string.
+import os
+import time
+from multiprocessing import Array, Pool, shared_memory
+
+import numpy as np
+
+from median_search import DnaWindows, MedianSearch
+from parallel_kmer_counter import attach
+
+# shards handed out per worker, enough for the pool to even out unbalanced subtrees
+SHARDS_PER_WORKER = 8
+NO_CODE = 2 ** 64 - 1
+
+# per-process state set by init_worker
+WORKER = {}
+
+
+def shard_depth(k: int, workers: int) -> int:
+  '''
+  Shortest prefix length giving at least SHARDS_PER_WORKER shards per worker, short of whole
+  k-mers so every shard is a subtree.
+  '''
+  depth = 0
+  while depth < k - 1 and 4 ** depth < SHARDS_PER_WORKER * workers:
+    depth += 1
+  return depth
+
+
+def init_worker(columns_name: str, shape: tuple, starts: np.ndarray, best, deadline: float):
+  block, columns = attach(columns_name, shape, np.uint8)
+  WORKER.update(block=block, windows=DnaWindows.from_arrays(columns, starts), best=best, deadline=deadline)
+
+
+def exchange_best(best_distance: int, best_code: int) -> tuple:
+  '''
+  Publishes a worker's best (distance, code) to the shared pair when it is better, and returns
+  the better of the two.
+  '''
+  shared = WORKER["best"]
+  with shared.get_lock():
+    if (best_distance, best_code) < (shared[0], shared[1]):
+      shared[0], shared[1] = best_distance, best_code
+    return int(shared[0]), int(shared[1])
+
+
+def search_shard(task: tuple) -> bool:
+  '''
+  Runs the branch and bound below one prefix, starting from the shared best.
+
+  Args:
+    task (tuple): (prefix, depth), the code and length of the prefix
+
+  Returns:
+    complete (bool): False when the deadline cut the shard short or kept it from starting
+  '''
+  prefix, depth = task
+  deadline = WORKER["deadline"]
+  if deadline is not None and time.monotonic() > deadline:
+    return False
+  best_distance, best_code = exchange_best(*WORKER["best"][:])
+  search = MedianSearch(WORKER["windows"], best_distance, best_code, exchange=exchange_best, deadline=deadline)
+  return search.search(prefix, depth)
+
+
+def parallel_median(dna: list, k: int, workers: int = None, time_budget: float = None) -> tuple:
+  '''
+  Finds the median string on a pool of worker processes. Without a time budget the result is
+  identical to median_search.branch_and_bound_median.
+
+  Args:
+    dna (list): the sequences
+    k (int): length of the median string
+    workers (int): number of worker processes, defaults to the number of CPUs
+    time_budget (float): seconds after which the search stops and reports the best k-mer found
+
+  Returns:
+    (median, distance, complete) (tuple): the median string (None if the budget ran out before
+      any k-mer was reached), d(median, Dna), and whether the whole tree was searched, i.e.
+      whether the median is exact
+  '''
+  k = int(k)
+  workers = workers or os.cpu_count()
+  windows = DnaWindows(dna, k)
+  deadline = None if time_budget is None else time.monotonic() + time_budget
+
+  if workers == 1:
+    search = MedianSearch(windows, deadline=deadline)
+    complete = search.search()
+    return search.median() + (complete,)
+
+  no_median = k * len(windows.starts) + 1
+  best = Array("Q", [no_median, NO_CODE])
+  depth = shard_depth(k, workers)
+  tasks = [(prefix, depth) for prefix in range(4 ** depth)]
+
+  columns_block = shared_memory.SharedMemory(create=True, size=max(windows.columns.nbytes, 1))
+  try:
+    np.ndarray(windows.columns.shape, dtype=np.uint8, buffer=columns_block.buf)[:] = windows.columns
+    initargs = (columns_block.name, windows.columns.shape, windows.starts, best, deadline)
+    with Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+      complete = all(list(pool.imap(search_shard, tasks, chunksize=1)))
+  finally:
+    columns_block.close()
+    columns_block.unlink()
+
+  if best[0] == no_median:
+    return None, no_median, complete
+  return MedianSearch(windows, best[0], best[1]).median() + (complete,)
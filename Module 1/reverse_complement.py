@@ -0,0 +1,106 @@
+# Reverse complement of DNA held as str, bytes, memory-mapped buffers or NumPy code arrays,
+# plus a streaming mode that reverse-complements a genome file back to front.
+import mmap
+import os
+
+import numpy as np
+
+# IUPAC ambiguity codes complement too (R=A/G <-> Y=C/T, ...), N and anything else stays put
+DNA_LETTERS = b"ACGTRYKMSWBDHVNacgtrykmswbdhvn"
+DNA_COMPLEMENTS = b"TGCAYRMKSWVHDBNtgcayrmkswvhdbn"
+
+BYTES_COMPLEMENT = bytes.maketrans(DNA_LETTERS, DNA_COMPLEMENTS)
+STR_COMPLEMENT = str.maketrans(DNA_LETTERS.decode("ascii"), DNA_COMPLEMENTS.decode("ascii"))
+ARRAY_COMPLEMENT = np.frombuffer(BYTES_COMPLEMENT, dtype=np.uint8)
+
+WHITESPACE = b" \t\r\n"
+CHUNK_SIZE = 1 << 24
+
+# masks for reversing the order of the 2-bit base groups inside a uint64
+GROUP_SWAPS = [(2, 0x3333333333333333), (4, 0x0F0F0F0F0F0F0F0F), (8, 0x00FF00FF00FF00FF),
+               (16, 0x0000FFFF0000FFFF), (32, 0x00000000FFFFFFFF)]
+
+
+def reverse_complement(sequence):
+  '''
+  Reverse complement of a DNA sequence using a translation table instead of per-base concatenation.
+
+  Args:
+    sequence (str, bytes, bytearray, memoryview, mmap or np.ndarray): the DNA sequence;
+      a uint8 array is taken as ASCII letters
+
+  Returns:
+    reverse_complement: same kind as the input (bytes for buffers, a new array for arrays)
+  '''
+  if isinstance(sequence, str):
+    return sequence.translate(STR_COMPLEMENT)[::-1]
+  if isinstance(sequence, np.ndarray):
+    return ARRAY_COMPLEMENT[sequence[::-1]]
+  if isinstance(sequence, (mmap.mmap, memoryview, bytearray)):
+    sequence = bytes(sequence)
+  return sequence.translate(BYTES_COMPLEMENT)[::-1]
+
+
+def reverse_complement_codes(codes, k: int):
+  '''
+  Reverse complement of integer k-mer codes (A=0, C=1, G=2, T=3), computed arithmetically:
+  complementing a base is x ^ 3, i.e. bitwise NOT of the code, and the k base groups are
+  reversed with a fixed number of mask-and-shift swaps.
+
+  Args:
+    codes (int or np.ndarray): k-mer codes (uint64 array or a single int)
+    k (int): length of the k-mers, at most 32
+
+  Returns:
+    reverse_complement_codes: codes of the reverse complements, same kind as codes
+  '''
+  if not isinstance(codes, np.ndarray):
+    return int(reverse_complement_codes(np.array([codes], dtype=np.uint64), k)[0])
+
+  x = ~codes.astype(np.uint64)
+  for shift, mask in GROUP_SWAPS:
+    shift, mask = np.uint64(shift), np.uint64(mask)
+    x = ((x >> shift) & mask) | ((x & mask) << shift)
+  return x >> np.uint64(64 - 2 * k)
+
+
+def canonical_codes(codes, k: int):
+  '''
+  Strand-agnostic k-mer codes: the smaller of each code and its reverse complement's code.
+  '''
+  return np.minimum(codes, reverse_complement_codes(codes, k))
+
+
+def write_reverse_complement(input_path: str, output_path: str, chunk_size: int = CHUNK_SIZE):
+  '''
+  Writes the reverse complement of a single-sequence genome file without loading it: the input
+  is memory-mapped and read back to front in chunks of chunk_size bytes. Line breaks are dropped,
+  so the output is one sequence line. A leading FASTA header line is copied unchanged.
+
+  Args:
+    input_path (str): genome file, raw sequence or single-record FASTA
+    output_path (str): file to write the reverse complement to
+    chunk_size (int): number of input bytes handled at a time
+  '''
+  with open(input_path, "rb") as source, open(output_path, "wb") as output:
+    size = os.fstat(source.fileno()).st_size
+    if size == 0:
+      return
+
+    with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as genome:
+      first_base = 0
+      if genome[:1] == b">":
+        newline = genome.find(b"\n")
+        first_base = size if newline == -1 else newline + 1
+        output.write(genome[:first_base])
+
+      if genome.find(b"\n>", max(first_base - 1, 0)) != -1:
+        raise ValueError(f"{input_path} holds more than one FASTA record")
+
+      end = size
+      while end > first_base:
+        start = max(first_base, end - chunk_size)
+        output.write(genome[start:end].translate(BYTES_COMPLEMENT, WHITESPACE)[::-1])
+        end = start
+
+      output.write(b"\n")
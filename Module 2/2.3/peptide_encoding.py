@@ -1,6 +1,10 @@
+import sys
 import pyperclip
 from rna_translation import import_rna_codon_table
 
+sys.path.append("../../Module 1")
+from reverse_complement import reverse_complement
+
 
 def dna_reverse_complement(sequence: str) -> str:
     '''
@@ -12,18 +16,8 @@ def dna_reverse_complement(sequence: str) -> str:
     Returns:
         str: The reverse complement of the DNA sequence.
     '''
-    dna_dict = {"A": "T", 
-            "T": "A", 
-            "C": "G", 
-            "G": "C"}
-    
-    complement = ""
     sequence = sequence.strip().upper()
-
-    for char in sequence:
-        complement += dna_dict[char]
-
-    return complement[::-1]
+    return reverse_complement(sequence)
 
 
 def transcript_dna_to_rna(dna_sequence: str) -> str: